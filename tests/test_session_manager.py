@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the session manager:
+- History/changes are appended to side logs and merged on load
+- save_session folds the logs back into the snapshot
+- end_session removes every session file
+- load_session reuses the parsed session until the file changes
+- Attached file bodies live outside the session JSON
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+from tools.session import manager
+
+
+def _use_dir(root: Path):
+    """Point the manager's files at a temporary directory"""
+    manager.SESSION_FILE = root / ".linkowiki-session.json"
+    manager.HISTORY_FILE = root / ".linkowiki-session.history.log"
+    manager.CHANGES_FILE = root / ".linkowiki-session.changes.log"
+    manager._SESSION_LOGS = (("history", manager.HISTORY_FILE), ("changes", manager.CHANGES_FILE))
+    manager.FILES_DIR = root / ".linkowiki-session.files"
+
+
+def _with_session_dir(test):
+    def run():
+        saved = (manager.SESSION_FILE, manager.HISTORY_FILE, manager.CHANGES_FILE,
+                 manager._SESSION_LOGS, manager.FILES_DIR)
+        with tempfile.TemporaryDirectory() as tmp:
+            _use_dir(Path(tmp))
+            try:
+                test(Path(tmp))
+            finally:
+                (manager.SESSION_FILE, manager.HISTORY_FILE, manager.CHANGES_FILE,
+                 manager._SESSION_LOGS, manager.FILES_DIR) = saved
+    run.__name__ = test.__name__
+    run.__doc__ = test.__doc__
+    return run
+
+
+@_with_session_dir
+def test_history_is_appended_and_merged(root):
+    """add_history/record_change do not rewrite the snapshot"""
+    manager.save_session({"history": ["old"], "changes": [], "files": {}})
+    snapshot = manager.SESSION_FILE.read_bytes()
+
+    manager.add_history("first\nline two")
+    manager.add_history("zweite Frage ä")
+    manager.record_change("write wiki/x.md")
+
+    assert manager.SESSION_FILE.read_bytes() == snapshot
+    s = manager.load_session()
+    assert s["history"] == ["old", "first\nline two", "zweite Frage ä"]
+    assert s["changes"] == ["write wiki/x.md"]
+    assert manager.session_counts(s) == (3, 0)
+
+    print("✓ history is appended and merged on load")
+
+
+@_with_session_dir
+def test_save_folds_logs_into_snapshot(root):
+    """Saving a loaded session keeps every entry exactly once"""
+    manager.save_session({"history": [], "changes": [], "files": {}})
+    manager.add_history("a")
+    s = manager.load_session()
+    manager.save_session(s)
+
+    assert not manager.HISTORY_FILE.exists()
+    assert manager.load_session()["history"] == ["a"]
+
+    print("✓ save_session folds the logs into the snapshot")
+
+
+@_with_session_dir
+def test_torn_line_and_end_session(root):
+    """A truncated log line is skipped; end_session removes all files"""
+    manager.save_session({"history": [], "changes": [], "files": {}})
+    manager.add_history("ok")
+    with open(manager.HISTORY_FILE, "ab") as f:
+        f.write(b'"cut')
+
+    assert manager.load_session()["history"] == ["ok"]
+
+    manager.end_session()
+    assert manager.load_session() is None
+    assert not manager.HISTORY_FILE.exists()
+    manager.add_history("ignored")  # no session, nothing written
+    assert not manager.HISTORY_FILE.exists()
+
+    print("✓ torn lines are skipped and end_session cleans up")
+
+
+@_with_session_dir
+def test_load_is_cached_until_file_changes(root):
+    """Repeated loads share one dict; appends and rewrites are picked up"""
+    manager.save_session({"history": [], "changes": [], "files": {}, "n": 1})
+    first = manager.load_session()
+    assert manager.load_session() is first
+
+    manager.add_history("neu")
+    assert manager.load_session() is first
+    assert first["history"] == ["neu"]
+    assert first["_history_count"] == 1
+
+    # Written behind the manager's back (e.g. another shell)
+    manager.SESSION_FILE.write_text('{"history": [], "changes": [], "files": {}, "n": 22}')
+    reloaded = manager.load_session()
+    assert reloaded is not first
+    assert reloaded["n"] == 22
+
+    print("✓ load_session is cached until the file changes")
+
+
+@_with_session_dir
+def test_attached_files_are_stored_by_hash(root):
+    """Only {path: hash} goes into the session JSON"""
+    source = root / "notes.md"
+    source.write_text("große Datei\n" * 100, encoding="utf-8")
+    manager.save_session({"history": [], "changes": [], "files": {}})
+
+    manager.attach_file(str(source))
+    raw = manager.SESSION_FILE.read_text(encoding="utf-8")
+    assert "große Datei" not in raw
+    assert "file_refs" in raw
+
+    manager._cached_session = None  # force a fresh parse
+    s = manager.load_session()
+    assert isinstance(s["files"], manager.AttachedFiles)
+    assert dict(s["files"]) == {str(source.resolve()): source.read_text(encoding="utf-8")}
+    assert manager.get_attached_file(str(source)) == source.read_text(encoding="utf-8")
+    assert manager.session_counts(s) == (0, 1)
+
+    # Legacy sessions with inline bodies are converted on the next save
+    manager.save_session({"history": [], "changes": [], "files": {"/x": "inline"}})
+    assert "inline" not in manager.SESSION_FILE.read_text(encoding="utf-8")
+    assert manager.load_session()["files"]["/x"] == "inline"
+
+    manager.end_session()
+    assert not manager.FILES_DIR.exists()
+
+    print("✓ attached files are stored by hash")
+
+
+if __name__ == "__main__":
+    print("Testing session manager...")
+    print()
+
+    test_history_is_appended_and_merged()
+    test_save_folds_logs_into_snapshot()
+    test_torn_line_and_end_session()
+    test_load_is_cached_until_file_changes()
+    test_attached_files_are_stored_by_hash()
+
+    print()
+    print("All tests passed! ✓")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the wiki search/browse helpers:
+- One-pass scan (categories, stats, recent files)
+- Hidden files are skipped
+- Cache invalidation
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root))
+
+from tools import wiki_search
+
+
+def _make_wiki(root: Path):
+    (root / "linux").mkdir()
+    (root / "dev" / "git").mkdir(parents=True)
+    (root / "README.md").write_text("# Wiki\n")
+    (root / "linux" / "systemctl.md").write_text("systemctl status\n")
+    (root / "dev" / "git" / "rebase.md").write_text("git rebase -i\n")
+    (root / ".changelog").write_text("hidden\n")
+    os.utime(root / "dev" / "git" / "rebase.md", (2_000_000_000, 2_000_000_000))
+
+
+def test_scan_wiki_matches_single_helpers():
+    """scan_wiki returns the same data as the individual helpers"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _make_wiki(root)
+
+        categories, stats, recent = wiki_search.scan_wiki(root, recent_limit=2)
+
+        assert categories == ["dev", "linux"]
+        assert categories == wiki_search.get_wiki_categories(root)
+        assert stats == wiki_search.get_category_stats(root)
+        assert stats["root"]["files"] == 1  # .changelog is hidden
+        assert stats["dev"]["files"] == 1
+        assert len(recent) == 2
+        assert recent[0][0] == str(root / "dev" / "git" / "rebase.md")
+        assert [p for p, _ in recent] == [p for p, _ in wiki_search.list_recent_files(root, limit=2)]
+
+    print("✓ scan_wiki matches the individual helpers")
+
+
+def test_search_skips_hidden_files():
+    """search_wiki only reports visible files"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _make_wiki(root)
+
+        results = wiki_search.search_wiki("HIDDEN", root)
+        assert results == []
+
+        results = wiki_search.search_wiki("rebase", root)
+        assert len(results) == 1
+        assert results[0][1] == ["Line 1: git rebase -i"]
+
+    print("✓ search_wiki skips hidden files")
+
+
+def test_search_follows_file_changes():
+    """Edited files are searched by their new content"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _make_wiki(root)
+
+        assert len(wiki_search.search_wiki("ase -", root)) == 1
+        assert wiki_search.search_wiki("journal", root) == []
+
+        (root / "linux" / "systemctl.md").write_text("see Journalctl too\n")
+        results = wiki_search.search_wiki("journal", root)
+        assert results == [(str(root / "linux" / "systemctl.md"), ["Line 1: see Journalctl too"])]
+
+    print("✓ search follows file changes")
+
+
+def test_category_cache_tracks_category_dirs():
+    """Files added to a category show up without invalidate_cache()"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _make_wiki(root)
+
+        stats = wiki_search.get_category_stats(root)
+        assert stats["linux"]["files"] == 1
+        stats["linux"]["files"] = 99  # callers get a copy
+        assert wiki_search.get_category_stats(root)["linux"]["files"] == 1
+
+        (root / "linux" / "journalctl.md").write_text("journalctl -f\n")
+        os.utime(root / "linux", ns=(1, 1))  # distinct mtime even on coarse clocks
+        assert wiki_search.get_category_stats(root)["linux"]["files"] == 2
+
+    print("✓ category cache tracks category dirs")
+
+
+def test_invalidate_cache_picks_up_nested_changes():
+    """Nested edits are visible after invalidate_cache()"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _make_wiki(root)
+
+        assert wiki_search.get_category_stats(root)["linux"]["files"] == 1
+        (root / "linux" / "journalctl.md").write_text("journalctl -f\n")
+
+        wiki_search.invalidate_cache()
+        assert wiki_search.get_category_stats(root)["linux"]["files"] == 2
+
+    print("✓ invalidate_cache picks up nested changes")
+
+
+if __name__ == "__main__":
+    print("Testing wiki search helpers...")
+    print()
+
+    test_scan_wiki_matches_single_helpers()
+    test_search_skips_hidden_files()
+    test_search_follows_file_changes()
+    test_category_cache_tracks_category_dirs()
+    test_invalidate_cache_picks_up_nested_changes()
+
+    print()
+    print("All tests passed! ✓")
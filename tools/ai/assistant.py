@@ -1,3 +1,6 @@
+import asyncio
+import queue
+import threading
 from pathlib import Path
 from pydantic import BaseModel
 from pydantic_ai import Agent
@@ -35,19 +38,8 @@ class AIResult(BaseModel):
     actions: list[Action] = []
 
 
-def run_ai(prompt: str, files: dict, session: dict = None):
-    """
-    Run AI with current session's provider and registered tools.
-    Agent is created per request using session's active_provider_id.
-    
-    Args:
-        prompt: User prompt
-        files: Attached files dict
-        session: Optional session dict (will load if not provided)
-    
-    Returns:
-        AIResult with message, options, and actions
-    """
+def _prepare_agent(prompt: str, files: dict, session: dict = None):
+    """Build the per-request agent and full prompt shared by all run_ai variants"""
     if session is None:
         from tools.session.manager import load_session
         session = load_session()
@@ -61,14 +53,18 @@ def run_ai(prompt: str, files: dict, session: dict = None):
         else:
             session = {"active_provider_id": registry.default_provider_id}
     
-    # Build context
-    context = ""
+    # Build context (joined once; += would re-copy every attached file)
+    parts = []
     if files:
-        context += "ANGEHÄNGTE DATEIEN:\n"
+        parts.append("ANGEHÄNGTE DATEIEN:\n")
         for name, content in files.items():
-            context += f"\nDATEI {name}:\n{content}\n"
+            parts.append(f"\nDATEI {name}:\n")
+            parts.append(content)
+            parts.append("\n")
     
-    full_prompt = f"{context}\nAUFGABE:\n{prompt}"
+    parts.append("\nAUFGABE:\n")
+    parts.append(prompt)
+    full_prompt = "".join(parts)
     
     # Create agent per request using session's provider with tools
     agent = create_agent_for_session(
@@ -84,7 +80,23 @@ def run_ai(prompt: str, files: dict, session: dict = None):
             git_status
         ]
     )
+    return agent, full_prompt
+
+
+def run_ai(prompt: str, files: dict, session: dict = None):
+    """
+    Run AI with current session's provider and registered tools.
+    Agent is created per request using session's active_provider_id.
+    
+    Args:
+        prompt: User prompt
+        files: Attached files mapping (only read, e.g. a dict or ChainMap)
+        session: Optional session dict (will load if not provided)
     
+    Returns:
+        AIResult with message, options, and actions
+    """
+    agent, full_prompt = _prepare_agent(prompt, files, session)
     result = agent.run_sync(full_prompt)
     return result.output
 
@@ -102,46 +114,69 @@ def run_ai_streaming(prompt: str, files: dict, session: dict = None):
     Returns:
         Stream context manager from agent.run_stream()
     """
-    if session is None:
-        from tools.session.manager import load_session
-        session = load_session()
-    
-    # Ensure session has active_provider_id
-    if not session or "active_provider_id" not in session or not session.get("active_provider_id"):
-        from tools.ai.providers import get_provider_registry
-        registry = get_provider_registry()
-        if session:
-            session["active_provider_id"] = registry.default_provider_id
-        else:
-            session = {"active_provider_id": registry.default_provider_id}
-    
-    # Build context
-    context = ""
-    if files:
-        context += "ANGEHÄNGTE DATEIEN:\n"
-        for name, content in files.items():
-            context += f"\nDATEI {name}:\n{content}\n"
-    
-    full_prompt = f"{context}\nAUFGABE:\n{prompt}"
-    
-    # Create agent per request using session's provider with tools
-    agent = create_agent_for_session(
-        session=session,
-        output_type=AIResult,
-        system_prompt=get_wiki_system_prompt(),
-        tools=[
-            search_wiki,
-            get_wiki_structure,
-            get_recent_changes,
-            read_file,
-            list_files,
-            git_status
-        ]
-    )
+    agent, full_prompt = _prepare_agent(prompt, files, session)
     
     # Return the stream context manager
     # The caller should handle it properly
     return agent.run_stream(full_prompt)
 
 
-
+def run_ai_stream(prompt: str, files: dict, session: dict = None):
+    """
+    Run AI and yield the response while it is generated (synchronous).
+    
+    The async run_stream() runs on its own event loop in a worker thread and
+    hands results over through a queue, so plain (non-async) UI code can
+    consume it with a for loop.
+    
+    Yields:
+        str snapshots of the message so far, then the final AIResult as
+        the last item.
+    """
+    agent, full_prompt = _prepare_agent(prompt, files, session)
+    # Bounded, so a slow consumer holds the producer back; stop is set when
+    # the consumer goes away (break, Ctrl+C, close()) and ends the worker
+    items = queue.Queue(maxsize=8)
+    stop = threading.Event()
+    done = object()
+    
+    def put(item) -> bool:
+        """Hand an item to the consumer; False once it stopped listening"""
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    async def produce():
+        async with agent.run_stream(full_prompt) as stream:
+            last_message = None
+            async for partial in stream.stream_output(debounce_by=0.1):
+                message = getattr(partial, "message", None)
+                if message and message != last_message:
+                    last_message = message
+                    if not put(message):
+                        return  # leaving the context manager ends the stream
+            put(await stream.get_output())
+    
+    def worker():
+        try:
+            asyncio.run(produce())
+        except BaseException as e:
+            put(e)
+        finally:
+            put(done)
+    
+    threading.Thread(target=worker, name="run_ai_stream", daemon=True).start()
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
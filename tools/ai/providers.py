@@ -7,6 +7,13 @@ from typing import Dict, Optional
 from pydantic import BaseModel, Field, field_validator
 import jsonschema
 
+# Optional: orjson parses several times faster than the json module
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 
 class ProviderConfig(BaseModel):
     """Configuration for a single AI provider/model - PydanticAI v2 compliant"""
@@ -76,12 +83,12 @@ class ProviderRegistry:
             raise FileNotFoundError(f"Provider schema not found: {self.schema_path}")
         
         # Load JSON
-        with open(self.config_path) as f:
-            data = json.load(f)
+        with open(self.config_path, "rb") as f:
+            data = _loads(f.read())
         
         # Load schema
-        with open(self.schema_path) as f:
-            schema = json.load(f)
+        with open(self.schema_path, "rb") as f:
+            schema = _loads(f.read())
         
         # Validate against schema
         try:
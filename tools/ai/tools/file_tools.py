@@ -1,5 +1,6 @@
 # tools/ai/tools/file_tools.py
 """File system tools for PydanticAI agent"""
+import stat
 from pathlib import Path
 from typing import List, Optional
 import glob as glob_module
@@ -19,18 +20,23 @@ def read_file(filepath: str) -> Optional[str]:
     """
     try:
         file_path = BASE_DIR / filepath
-        if file_path.exists() and file_path.is_file():
-            # Don't read binary files or very large files
-            if file_path.stat().st_size > 1_000_000:  # 1MB limit
-                return f"[File too large: {file_path.stat().st_size} bytes]"
-            
-            # Try to read as text
-            try:
-                return file_path.read_text(encoding='utf-8')
-            except UnicodeDecodeError:
-                return "[Binary file - cannot display content]"
-        else:
+        # One stat() answers exists, is-a-file and size together
+        try:
+            st = file_path.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not stat.S_ISREG(st.st_mode):
             return None
+        
+        # Don't read binary files or very large files
+        if st.st_size > 1_000_000:  # 1MB limit
+            return f"[File too large: {st.st_size} bytes]"
+        
+        # Try to read as text
+        try:
+            return file_path.read_text(encoding='utf-8')
+        except UnicodeDecodeError:
+            return "[Binary file - cannot display content]"
     except Exception as e:
         return f"[Error reading file: {str(e)}]"
 
@@ -57,7 +63,8 @@ def list_files(pattern: str = "*") -> List[str]:
         files = []
         for match in matches:
             path = Path(match)
-            if path.is_file() and not path.name.startswith('.'):
+            # Name check first: hidden entries don't need a stat()
+            if not path.name.startswith('.') and path.is_file():
                 try:
                     relative = path.relative_to(BASE_DIR)
                     files.append(str(relative))
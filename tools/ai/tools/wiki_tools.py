@@ -9,7 +9,7 @@ import sys
 BASE_DIR = Path(__file__).resolve().parents[3]
 sys.path.insert(0, str(BASE_DIR))
 
-from tools.wiki_search import search_wiki as wiki_search_func, list_recent_files
+from tools.wiki_search import search_wiki as wiki_search_func, list_recent_files, _iter_wiki_entries
 
 WIKI_ROOT = BASE_DIR / "wiki"
 
@@ -28,7 +28,7 @@ def search_wiki(query: str) -> List[Dict[str, Any]]:
     
     output = []
     for file_path, matches in results:
-        relative_path = str(file_path.relative_to(WIKI_ROOT))
+        relative_path = os.path.relpath(file_path, WIKI_ROOT)
         output.append({
             "path": relative_path,
             "matches": matches[:5]  # Limit to 5 matches per file
@@ -48,23 +48,15 @@ def get_wiki_structure() -> Dict[str, Any]:
         return {"categories": [], "total_entries": 0}
     
     structure = {"categories": {}, "total_entries": 0}
+    categories = structure["categories"]
     
-    for item in WIKI_ROOT.rglob("*"):
-        if item.is_file() and not item.name.startswith('.'):
-            relative_path = item.relative_to(WIKI_ROOT)
-            parts = relative_path.parts
-            
-            if len(parts) > 1:
-                category = parts[0]
-                if category not in structure["categories"]:
-                    structure["categories"][category] = []
-                structure["categories"][category].append(str(relative_path))
-            else:
-                if "root" not in structure["categories"]:
-                    structure["categories"]["root"] = []
-                structure["categories"]["root"].append(str(relative_path))
-            
-            structure["total_entries"] += 1
+    # One scandir walk (no Path object or extra stat() per entry)
+    prefix_len = len(os.fspath(WIKI_ROOT)) + len(os.sep)
+    for entry in _iter_wiki_entries(WIKI_ROOT):
+        relative_path = entry.path[prefix_len:]
+        category, sep, _ = relative_path.partition(os.sep)
+        categories.setdefault(category if sep else "root", []).append(relative_path)
+        structure["total_entries"] += 1
     
     return structure
 
@@ -83,11 +75,12 @@ def get_recent_changes(limit: int = 10) -> List[Dict[str, Any]]:
     
     output = []
     for file_path, mtime in recent_files:
-        relative_path = str(file_path.relative_to(WIKI_ROOT))
+        relative_path = os.path.relpath(file_path, WIKI_ROOT)
         
         # Read first few lines for preview
         try:
-            content = file_path.read_text(encoding='utf-8')
+            with open(file_path, encoding='utf-8') as f:
+                content = f.read()
             lines = content.split('\n')
             preview = '\n'.join(lines[:3]) if len(lines) > 3 else content
         except (UnicodeDecodeError, IOError):
@@ -3,11 +3,13 @@
 LinkoWiki Copilot CLI - Full Interactive Implementation
 Professional Copilot-style CLI with complete feature set
 """
+import bisect
 import os
 import sys
 import shutil
 import time
 import signal
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List, Tuple
 
@@ -45,6 +47,29 @@ class Colors:
     BRIGHT_MAGENTA = "\033[95m"
 
 
+@lru_cache(maxsize=8)
+def _header_line(width: int, cwd: str, git_branch: str, right: str) -> str:
+    """Header status bar, cached per (width, cwd, branch, model) combination"""
+    home = os.path.expanduser("~")
+    left = "~" + cwd[len(home):] if cwd.startswith(home) else cwd
+    if git_branch:
+        left += f"[ {git_branch}]"
+    spacing = max(width - len(left) - len(right), 1)
+    return f"{Colors.DIM}{left}{' ' * spacing}{right}{Colors.RESET}"
+
+
+@lru_cache(maxsize=8)
+def _help_bar_line(width: int, left: str, right: str) -> str:
+    """Dimmed 'left<padding>right' bar, cached like _header_line"""
+    spacing = max(width - len(left) - len(right), 1)
+    return f"{Colors.DIM}{left}{' ' * spacing}{right}{Colors.RESET}"
+
+
+@lru_cache(maxsize=4)
+def _separator_line(width: int) -> str:
+    return f"{Colors.DIM}{'─' * width}{Colors.RESET}"
+
+
 class CopilotCLI:
     """Full Copilot-style CLI implementation"""
     
@@ -63,22 +88,22 @@ class CopilotCLI:
         """Get current git branch with dirty indicator"""
         try:
             import subprocess
+            # One call yields both: "# branch.head <name>" plus a record per change
             result = subprocess.run(
-                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+                ["git", "status", "--porcelain=v2", "--branch", "-z"],
                 capture_output=True,
-                text=True,
                 cwd=BASE_DIR
             )
             if result.returncode == 0:
-                branch = result.stdout.strip()
-                # Check if dirty
-                status = subprocess.run(
-                    ["git", "status", "--porcelain"],
-                    capture_output=True,
-                    text=True,
-                    cwd=BASE_DIR
-                )
-                is_dirty = bool(status.stdout.strip())
+                branch = ""
+                is_dirty = False
+                for record in result.stdout.decode("utf-8", "replace").split("\0"):
+                    if record.startswith("# branch.head "):
+                        branch = record[len("# branch.head "):]
+                        if branch == "(detached)":
+                            branch = "HEAD"
+                    elif record and not record.startswith("#"):
+                        is_dirty = True
                 return f"{branch}*" if is_dirty else branch
             return ""
         except:
@@ -93,40 +118,19 @@ class CopilotCLI:
     
     def _render_header(self) -> str:
         """Render upper status bar"""
-        short_cwd = self._shorten_path()
-        left = short_cwd
-        if self.git_branch:
-            left += f"[ {self.git_branch}]"
-        
-        right = f"{self.model_name} ({self.model_count})"
-        
-        spacing = self.term_width - len(left) - len(right)
-        if spacing < 1:
-            spacing = 1
-        
-        return f"{Colors.DIM}{left}{' ' * spacing}{right}{Colors.RESET}"
+        return _header_line(self.term_width, self.cwd, self.git_branch,
+                            f"{self.model_name} ({self.model_count})")
     
     def _render_separator(self) -> str:
         """Render horizontal separator line"""
-        return f"{Colors.DIM}{'─' * self.term_width}{Colors.RESET}"
+        return _separator_line(self.term_width)
     
     def _render_footer_status(self) -> str:
         """Render lower status bar with context usage"""
-        short_cwd = self._shorten_path()
-        left = short_cwd
-        if self.git_branch:
-            left += f"[ {self.git_branch}]"
-        
+        # Same layout as the header, with the context usage after the model
         middle = f"{self.model_name} ({self.model_count})"
         right = f"{int(self.context_usage * 100)}% to truncation"
-        
-        # Calculate spacing
-        total_middle_right = len(middle) + len(right) + 3  # +3 for spacing
-        spacing_left = self.term_width - len(left) - total_middle_right
-        if spacing_left < 1:
-            spacing_left = 1
-        
-        return f"{Colors.DIM}{left}{' ' * spacing_left}{middle}   {right}{Colors.RESET}"
+        return _header_line(self.term_width, self.cwd, self.git_branch, f"{middle}   {right}")
     
     def _render_prompt(self, text: str = "", placeholder: bool = True) -> str:
         """Render input prompt"""
@@ -139,14 +143,8 @@ class CopilotCLI:
     
     def _render_help_bar(self) -> str:
         """Render global help bar (bottom line)"""
-        left = "Ctrl+C Exit · Ctrl+R Expand recent"
-        right = f"Remaining requests: {self.requests_remaining}%"
-        
-        spacing = self.term_width - len(left) - len(right)
-        if spacing < 1:
-            spacing = 1
-        
-        return f"{Colors.DIM}{left}{' ' * spacing}{right}{Colors.RESET}"
+        return _help_bar_line(self.term_width, "Ctrl+C Exit · Ctrl+R Expand recent",
+                              f"Remaining requests: {self.requests_remaining}%")
     
     def _render_active_task(self) -> Optional[str]:
         """Render live status message for running task"""
@@ -241,6 +239,8 @@ class CopilotCompleter(Completer):
         ("apply", "Apply pending actions"),
         ("reject", "Reject pending actions"),
     ]
+    _COMMANDS_SORTED = sorted(COMMANDS)
+    _COMMAND_KEYS = [cmd for cmd, _ in _COMMANDS_SORTED]
 
     def __init__(self):
         self.files_cache = []
@@ -257,7 +257,8 @@ class CopilotCompleter(Completer):
                 cwd=BASE_DIR
             )
             if result.returncode == 0:
-                self.files_cache = result.stdout.strip().split('\n')
+                # Sorted, so completions can bisect to the prefix range
+                self.files_cache = sorted(result.stdout.strip().split('\n'))
         except:
             self.files_cache = []
 
@@ -268,24 +269,29 @@ class CopilotCompleter(Completer):
         if '@' in text:
             at_pos = text.rfind('@')
             file_prefix = text[at_pos + 1:]
-            for file_path in self.files_cache:
-                if file_path.startswith(file_prefix):
-                    yield Completion(
-                        file_path,
-                        start_position=-len(file_prefix),
-                        display=file_path,
-                        display_meta="📄 File"
-                    )
+            files = self.files_cache
+            i = bisect.bisect_left(files, file_prefix)
+            while i < len(files) and files[i].startswith(file_prefix):
+                yield Completion(
+                    files[i],
+                    start_position=-len(file_prefix),
+                    display=files[i],
+                    display_meta="📄 File"
+                )
+                i += 1
         # Slash commands
         elif text.startswith('/') or not text:
-            for cmd, desc in self.COMMANDS:
-                if cmd.startswith(text if text else '/'):
-                    yield Completion(
-                        cmd,
-                        start_position=-len(text) if text else 0,
-                        display=cmd,
-                        display_meta=desc
-                    )
+            prefix = text if text else '/'
+            i = bisect.bisect_left(self._COMMAND_KEYS, prefix)
+            while i < len(self._COMMAND_KEYS) and self._COMMAND_KEYS[i].startswith(prefix):
+                cmd, desc = self._COMMANDS_SORTED[i]
+                yield Completion(
+                    cmd,
+                    start_position=-len(text) if text else 0,
+                    display=cmd,
+                    display_meta=desc
+                )
+                i += 1
 
 
 def interactive_copilot_shell():
@@ -6,6 +6,7 @@ Based on design.md specifications
 import os
 import sys
 import shutil
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 
@@ -28,6 +29,21 @@ class Colors:
     BRIGHT_WHITE = "\033[97m"
 
 
+@lru_cache(maxsize=8)
+def _header_line(width: int, cwd: str, git_branch: str, right: str) -> str:
+    """Dimmed 'cwd[ branch]<padding>right' status line
+
+    Its inputs only change when the model or terminal does, so the line is
+    built once and reused instead of on every redraw.
+    """
+    home = os.path.expanduser("~")
+    left = "~" + cwd[len(home):] if cwd.startswith(home) else cwd
+    if git_branch:
+        left += f"[ {git_branch}]"
+    spacing = max(width - len(left) - len(right), 1)
+    return f"{Colors.DIM}{left}{' ' * spacing}{right}{Colors.RESET}"
+
+
 class CopilotShell:
     """Copilot-style interactive shell"""
     
@@ -45,6 +61,8 @@ class CopilotShell:
         "/apply": "Apply pending actions",
         "/reject": "Reject pending actions",
     }
+    # (lowercased command, command, description), lowered once
+    _COMMANDS_LOWER = tuple((cmd.lower(), cmd, desc) for cmd, desc in COMMANDS.items())
     
     def __init__(self):
         self.term_width, self.term_height = shutil.get_terminal_size(fallback=(80, 24))
@@ -57,22 +75,22 @@ class CopilotShell:
         """Get current git branch"""
         try:
             import subprocess
+            # One call yields both: "# branch.head <name>" plus a record per change
             result = subprocess.run(
-                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+                ["git", "status", "--porcelain=v2", "--branch", "-z"],
                 capture_output=True,
-                text=True,
                 cwd=BASE_DIR
             )
             if result.returncode == 0:
-                branch = result.stdout.strip()
-                # Check if dirty
-                status = subprocess.run(
-                    ["git", "status", "--porcelain"],
-                    capture_output=True,
-                    text=True,
-                    cwd=BASE_DIR
-                )
-                is_dirty = bool(status.stdout.strip())
+                branch = ""
+                is_dirty = False
+                for record in result.stdout.decode("utf-8", "replace").split("\0"):
+                    if record.startswith("# branch.head "):
+                        branch = record[len("# branch.head "):]
+                        if branch == "(detached)":
+                            branch = "HEAD"
+                    elif record and not record.startswith("#"):
+                        is_dirty = True
                 return f"{branch}*" if is_dirty else branch
             return ""
         except:
@@ -81,28 +99,8 @@ class CopilotShell:
     def _print_header(self):
         """Print header line with cwd and model info"""
         # Format: ~/path/to/dir[ branch*]                                      model-name (1x)
-        
-        # Shorten path
-        home = os.path.expanduser("~")
-        if self.cwd.startswith(home):
-            short_cwd = "~" + self.cwd[len(home):]
-        else:
-            short_cwd = self.cwd
-        
-        # Build left side
-        left = short_cwd
-        if self.git_branch:
-            left += f"[ {self.git_branch}]"
-        
-        # Build right side
-        right = f"{self.model_name} ({self.model_count})"
-        
-        # Calculate spacing
-        spacing = self.term_width - len(left) - len(right)
-        if spacing < 1:
-            spacing = 1
-        
-        print(f"{Colors.DIM}{left}{' ' * spacing}{right}{Colors.RESET}")
+        print(_header_line(self.term_width, self.cwd, self.git_branch,
+                           f"{self.model_name} ({self.model_count})"))
     
     def _print_separator(self):
         """Print horizontal separator line"""
@@ -137,11 +135,8 @@ class CopilotShell:
     def _filter_commands(self, prefix: str) -> List[Tuple[str, str]]:
         """Filter commands by prefix"""
         prefix = prefix.lower()
-        matches = []
-        for cmd, desc in self.COMMANDS.items():
-            if cmd.lower().startswith(prefix):
-                matches.append((cmd, desc))
-        return matches
+        return [(cmd, desc) for cmd_lower, cmd, desc in self._COMMANDS_LOWER
+                if cmd_lower.startswith(prefix)]
     
     def _get_files_for_autocomplete(self, prefix: str = "") -> List[Tuple[str, str]]:
         """Get files/directories for @ autocomplete"""
@@ -216,7 +211,12 @@ class CopilotShell:
     
     def clear_screen(self):
         """Clear terminal screen"""
-        os.system('clear' if os.name != 'nt' else 'cls')
+        if os.name != 'nt':
+            # Home, clear screen, clear scrollback - the same bytes `clear` sends
+            sys.stdout.write("\x1b[H\x1b[2J\x1b[3J")
+            sys.stdout.flush()
+        else:
+            os.system('cls')
 
 
 def demo_views():
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 import argparse
+import bisect
 import json
+import mmap
 import os
 import re
 import sys
 import shutil
+import time
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
@@ -34,6 +38,7 @@ from tools.session.manager import (
     end_session,
     load_session,
     add_history,
+    session_counts,
     attach_file,
 )
 
@@ -75,24 +80,79 @@ class Colors:
 
 
 def get_terminal_size():
-    """Get terminal width and height"""
+    """Get terminal width and height.
+
+    Queried per frame (one ioctl): a size cached until SIGWINCH goes stale
+    because prompt_toolkit swaps the SIGWINCH handler out while prompting.
+    """
     return shutil.get_terminal_size(fallback=(80, 24))
 
 
 ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
 
+# Precomputed box-drawing runs; redraw paths slice these instead of
+# building '─' * width on every frame
+_MAX_WIDTH = 1024
+_DASHES = "─" * _MAX_WIDTH
+_EQUALS = "═" * _MAX_WIDTH
+_SPACES = " " * _MAX_WIDTH
 
-def strip_ansi(text: str) -> str:
+
+def _run(run: str, n: int) -> str:
+    """First n characters of a precomputed run (multiplied past _MAX_WIDTH)"""
+    # Slicing alone would silently truncate rules on very wide terminals
+    return run[:n] if 0 <= n <= _MAX_WIDTH else run[:1] * n
+
+
+# The escape sequences the panels are built from, most frequent first.
+# None is a substring of another (each ends at its only 'm'), so str.count
+# per token adds up to the exact number of escape bytes they account for.
+_ANSI_TOKENS = tuple(
+    (tok, len(tok)) for tok in dict.fromkeys((
+        Colors.RESET, Colors.DIM, Colors.ACCENT, Colors.BRIGHT_WHITE,
+        Colors.RED, Colors.YELLOW,
+    ))
+)
+
+
+@lru_cache(maxsize=1024)
+def _strip_sgr(text: str) -> str:
+    # Colored lines recur on every frame; a cache hit skips the regex scan
     return ANSI_RE.sub("", text)
 
 
+def strip_ansi(text: str) -> str:
+    # Plain text (no ESC at all) skips the regex
+    return _strip_sgr(text) if "\x1b" in text else text
+
+
 def visible_len(text: str) -> int:
-    return len(strip_ansi(text))
+    escapes = text.count("\x1b")
+    if not escapes:
+        return len(text)
+    # Subtract the known Colors tokens; only strings with other escape
+    # sequences left over fall back to the regex
+    n = len(text)
+    for tok, tok_len in _ANSI_TOKENS:
+        c = text.count(tok)
+        if c:
+            n -= c * tok_len
+            escapes -= c
+            if not escapes:
+                return n
+    return len(_strip_sgr(text))
 
 
 def pad_to(text: str, width: int) -> str:
-    padding = max(width - visible_len(text), 0)
-    return f"{text}{' ' * padding}"
+    # Plain cells skip the extra call as well as the token counting
+    vlen = visible_len(text) if "\x1b" in text else len(text)
+    return f"{text}{_run(_SPACES, width - vlen)}" if vlen < width else text
+
+
+def _render(lines):
+    """Write a whole frame with a single write/flush instead of one print per line"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 
 def print_box(text, color=Colors.CYAN, prefix="", width=70):
@@ -141,9 +201,18 @@ def print_actions_box(actions):
     print(f"\n{Colors.BRIGHT_BLACK}  → Tippe {Colors.RESET}{Colors.BRIGHT_WHITE}apply{Colors.RESET}{Colors.BRIGHT_BLACK} zum Ausführen oder diskutiere weiter{Colors.RESET}\n")
 
 
+# Home, clear screen, clear scrollback: what `clear` itself sends
+CLEAR_SEQUENCE = "\x1b[H\x1b[2J\x1b[3J"
+
+
 def clear_screen():
     """Clear terminal screen"""
-    os.system('clear' if os.name != 'nt' else 'cls')
+    if os.name != 'nt':
+        # Written directly instead of spawning a shell running `clear`
+        sys.stdout.write(CLEAR_SEQUENCE)
+        sys.stdout.flush()
+    else:
+        os.system('cls')
 
 
 def print_separator(char="─", color=Colors.BRIGHT_BLACK):
@@ -172,64 +241,92 @@ def print_options(options):
     print()
 
 
+_GIT_BRANCH_CACHE = (0.0, None)  # (monotonic timestamp, branch)
+
+
 def get_git_branch():
-    """Get current git branch with dirty indicator"""
+    """Get current git branch with dirty indicator (one git call, cached for a second)"""
+    global _GIT_BRANCH_CACHE
+    ts, branch = _GIT_BRANCH_CACHE
+    now = time.monotonic()
+    if branch is not None and now - ts < 1.0:
+        return branch
+
     try:
         import subprocess
         result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+            ["git", "status", "--branch", "--porcelain=v2", "-z"],
             capture_output=True,
-            text=True,
             cwd=BASE_DIR
         )
+        branch = ""
+        is_dirty = False
         if result.returncode == 0:
-            branch = result.stdout.strip()
-            # Check if dirty
-            status = subprocess.run(
-                ["git", "status", "--porcelain"],
-                capture_output=True,
-                text=True,
-                cwd=BASE_DIR
-            )
-            is_dirty = bool(status.stdout.strip())
-            return f"{branch}*" if is_dirty else branch
-        return ""
+            for record in result.stdout.decode("utf-8", "replace").split("\0"):
+                if record.startswith("# branch.head "):
+                    branch = record[len("# branch.head "):]
+                    if branch == "(detached)":
+                        branch = "HEAD"
+                elif record and not record.startswith("#"):
+                    is_dirty = True
+        if branch and is_dirty:
+            branch = f"{branch}*"
     except:
-        return ""
+        branch = ""
 
+    _GIT_BRANCH_CACHE = (now, branch)
+    return branch
 
-def build_claude_panel_lines(session, term_width):
-    """Build Claude-style panel header lines."""
-    from tools.ai.providers import get_provider_registry
-    
+
+_LAST_PANEL = (None, ())  # (key, lines) of the last built panel
+
+
+# Resolved once; the panel shortens the cwd against it on every redraw
+HOME = os.path.expanduser("~")
+
+
+def build_claude_panel_lines(session, term_width, registry=None):
+    """Build Claude-style panel header lines.
+
+    The interactive shell passes the provider registry it looked up once;
+    other callers leave it None and it is fetched here.
+    """
     # Ensure session has provider
     if "active_provider_id" not in session or not session.get("active_provider_id"):
-        from tools.config import get_config
-        config = get_config()
-        session["active_provider_id"] = config.default_provider
+        session["active_provider_id"] = CONFIG.default_provider
     
-    registry = get_provider_registry()
+    if registry is None:
+        from tools.ai.providers import get_provider_registry
+        registry = get_provider_registry()
     provider = registry.get_provider(session.get("active_provider_id"))
     
     # Shorten path
     cwd = os.getcwd()
-    home = os.path.expanduser("~")
-    if cwd.startswith(home):
-        short_cwd = "~" + cwd[len(home):]
+    if cwd.startswith(HOME):
+        short_cwd = "~" + cwd[len(HOME):]
     else:
         short_cwd = cwd
     
     # Git branch
     git_branch = get_git_branch()
     
+    branch_label = f"{short_cwd}{f' [{git_branch}]' if git_branch else ''}"
+    sg = session.get
+    history_count, _ = session_counts(session)
+
+    # Everything the panel shows; an unchanged key reuses the last panel
+    global _LAST_PANEL
+    key = (term_width, provider.id, branch_label, sg('id', 'unknown'), bool(sg('write')), history_count)
+    if _LAST_PANEL[0] == key:
+        return list(_LAST_PANEL[1])
+
     model_short = provider.id.replace("openai-", "").replace("anthropic-", "")
     model_label = f"{Colors.DIM}{model_short} (1x){Colors.RESET}"
-    branch_label = f"{short_cwd}{f' [{git_branch}]' if git_branch else ''}"
 
     inner_width = max(term_width - 2, 40)
     content_width = inner_width - 2
     lines = []
-    lines.append(f"{Colors.ACCENT}╭{'─' * inner_width}╮{Colors.RESET}")
+    lines.append(f"{Colors.ACCENT}╭{_run(_DASHES, inner_width)}╮{Colors.RESET}")
 
     title_left = f"{Colors.BRIGHT_WHITE}LinkoWiki Code{Colors.RESET} {Colors.DIM}Session{Colors.RESET}"
     title_spacing = content_width - visible_len(title_left) - visible_len(model_label)
@@ -237,15 +334,15 @@ def build_claude_panel_lines(session, term_width):
         title_spacing = 1
     title_line = (
         f"{Colors.ACCENT}│{Colors.RESET} "
-        f"{title_left}{' ' * title_spacing}{model_label}"
+        f"{title_left}{_run(_SPACES, title_spacing)}{model_label}"
         f" {Colors.ACCENT}│{Colors.RESET}"
     )
     lines.append(title_line)
 
     left_lines = [
         f"{Colors.BRIGHT_WHITE}Welcome back!{Colors.RESET}",
-        f"{Colors.DIM}Session ID: {session.get('id', 'unknown')}{Colors.RESET}",
-        f"{Colors.DIM}Mode: {'Write' if session.get('write') else 'Read-only'}{Colors.RESET}",
+        f"{Colors.DIM}Session ID: {sg('id', 'unknown')}{Colors.RESET}",
+        f"{Colors.DIM}Mode: {'Write' if sg('write') else 'Read-only'}{Colors.RESET}",
         f"{Colors.DIM}Path: {branch_label}{Colors.RESET}",
     ]
     right_lines = [
@@ -253,7 +350,7 @@ def build_claude_panel_lines(session, term_width):
         f"{Colors.DIM}Use /help to see commands{Colors.RESET}",
         f"{Colors.DIM}Use /attach <file> to add context{Colors.RESET}",
         f"{Colors.BRIGHT_WHITE}Recent activity{Colors.RESET}",
-        f"{Colors.DIM}{len(session.get('history', []))} messages so far{Colors.RESET}",
+        f"{Colors.DIM}{history_count} messages so far{Colors.RESET}",
     ]
 
     left_width = (content_width - 1) // 2
@@ -271,74 +368,103 @@ def build_claude_panel_lines(session, term_width):
             f"{right_padded} {Colors.ACCENT}│{Colors.RESET}"
         )
 
-    lines.append(f"{Colors.ACCENT}╰{'─' * inner_width}╯{Colors.RESET}")
+    lines.append(f"{Colors.ACCENT}╰{_run(_DASHES, inner_width)}╯{Colors.RESET}")
+    _LAST_PANEL = (key, tuple(lines))
     return lines
 
 
-def print_copilot_header(session):
+def print_copilot_header(session, registry=None):
     """Print Claude-style header panel."""
     term_width, _ = get_terminal_size()
-    for line in build_claude_panel_lines(session, term_width):
-        print(line)
+    _render(build_claude_panel_lines(session, term_width, registry))
 
 
 def print_user_input(text):
     """Format user input"""
-    print(f"\n{Colors.BRIGHT_BLACK}▶{Colors.RESET} {text}")
-    print()
+    _render(["", f"{Colors.BRIGHT_BLACK}▶{Colors.RESET} {text}", ""])
 
 
 def print_assistant_message(text):
     """Format assistant response"""
-    print(f"{Colors.CYAN}◆{Colors.RESET} {Colors.BOLD}Assistant{Colors.RESET}")
-    print("─" * 50)
-    
+    lines = [f"{Colors.CYAN}◆{Colors.RESET} {Colors.BOLD}Assistant{Colors.RESET}", _DASHES[:50]]
+
     import textwrap
     for line in text.split('\n'):
         if line.strip():
-            wrapped = textwrap.fill(line, width=60, initial_indent="  ", subsequent_indent="  ")
-            print(wrapped)
+            lines.append(textwrap.fill(line, width=60, initial_indent="  ", subsequent_indent="  "))
         else:
-            print()
-    print()
+            lines.append("")
+    lines.append("")
+    _render(lines)
 
 
 def print_actions_box(actions):
     """Print actions in a styled box"""
-    print(f"{Colors.YELLOW}⚡ Actions{Colors.RESET}")
-    print("─" * 50)
-    
+    lines = [f"{Colors.YELLOW}⚡ Actions{Colors.RESET}", _DASHES[:50]]
+
     for a in actions:
         action_type = a.type.upper()
-        print(f"  {action_type:8} {a.path}")
-    
-    print()
-    print(f"{Colors.DIM}  → 'apply' to execute{Colors.RESET}")
-    print()
+        lines.append(f"  {action_type:8} {a.path}")
+
+    lines.append("")
+    lines.append(f"{Colors.DIM}  → 'apply' to execute{Colors.RESET}")
+    lines.append("")
+    _render(lines)
 
 
 def print_options(options):
     """Print interactive options in Copilot style"""
     if not options:
         return
-    
+
     term_width, _ = get_terminal_size()
-    
-    print()
-    print(f"{Colors.BRIGHT_WHITE}Options:{Colors.RESET}")
-    print(f"{Colors.DIM}{'─' * term_width}{Colors.RESET}")
-    
+
+    lines = [
+        "",
+        f"{Colors.BRIGHT_WHITE}Options:{Colors.RESET}",
+        f"{Colors.DIM}{_run(_DASHES, term_width)}{Colors.RESET}",
+    ]
+
     for i, opt in enumerate(options, 1):
         label = opt.label if hasattr(opt, 'label') else opt
         desc = opt.description if hasattr(opt, 'description') else None
-        
-        print(f"  {Colors.BRIGHT_WHITE}{i}.{Colors.RESET} {label}")
+
+        lines.append(f"  {Colors.BRIGHT_WHITE}{i}.{Colors.RESET} {label}")
         if desc:
-            print(f"     {Colors.DIM}{desc}{Colors.RESET}")
-    
-    print()
-    print(f"  {Colors.DIM}Type number to select or enter custom message{Colors.RESET}")
-    print()
+            lines.append(f"     {Colors.DIM}{desc}{Colors.RESET}")
+
+    lines.append("")
+    lines.append(f"  {Colors.DIM}Type number to select or enter custom message{Colors.RESET}")
+    lines.append("")
+    _render(lines)
+
+
+def _iter_tree(root):
+    """Yield (depth, dir name, sorted visible file names) in pre-order.
+
+    Iterative os.scandir walk: no recursion limit, hidden entries are
+    skipped before sorting, and hidden directories are never entered.
+    """
+    stack = [(os.fspath(root), os.path.basename(os.fspath(root)), 0)]
+    while stack:
+        path, name, depth = stack.pop()
+        dirs = []
+        files = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append((entry.name, entry.path))
+                    else:
+                        files.append(entry.name)
+        except OSError:
+            continue
+        files.sort()
+        yield depth, name, files
+        # Reverse so the alphabetically first directory is popped next
+        stack.extend((p, n, depth + 1) for n, p in sorted(dirs, reverse=True))
 
 
 def print_tree():
@@ -347,13 +473,13 @@ def print_tree():
         return
 
     print(f"📚 Wiki-Struktur ({WIKI_DIR}):\n")
-    for root, dirs, files in os.walk(WIKI_DIR):
-        level = Path(root).relative_to(WIKI_DIR).parts
-        indent = "  " * len(level)
-        print(f"{indent}📂 {Path(root).name}")
-        for f in sorted(files):
-            print(f"{indent}  📄 {f}")
-    print()
+    lines = []
+    for depth, name, files in _iter_tree(WIKI_DIR):
+        indent = "  " * depth
+        lines.append(f"{indent}📂 {name}")
+        lines.extend(f"{indent}  📄 {f}" for f in files)
+    lines.append("")
+    _render(lines)
 
 
 def confirm():
@@ -408,13 +534,15 @@ def apply_actions(actions, write):
             target.write_text(target.read_text() + "\n" + (a.content or ""))
 
     log_change(actions)
+    from tools.wiki_search import invalidate_cache
+    invalidate_cache()
     print(f"\n{Colors.GREEN}✓ Änderungen erfolgreich angewendet{Colors.RESET}\n")
 
 
 def print_copilot_separator():
     """Print horizontal separator line (full width)"""
     term_width, _ = get_terminal_size()
-    print(f"{Colors.DIM}{'─' * term_width}{Colors.RESET}")
+    print(f"{Colors.DIM}{_run(_DASHES, term_width)}{Colors.RESET}")
 
 
 def print_copilot_prompt(text=""):
@@ -422,6 +550,200 @@ def print_copilot_prompt(text=""):
     print(f"> {text}", end="", flush=True)
 
 
+def _print_shell_hints():
+    _render([
+        f"{Colors.DIM}Try \"/help\" for commands{Colors.RESET}",
+        f"{Colors.DIM}? for shortcuts{Colors.RESET}",
+        "",
+    ])
+
+
+# Session shell command handlers: each receives the argument string after the
+# command word and the shell state dict ("session", "conversation", ...).
+
+def _shell_clear(rest, state):
+    state["conversation"].clear()
+    state["rendered_turns"] = 0
+    state["last_content"] = []
+    clear_screen()  # Only clear on explicit user request
+    # Re-print header after clear
+    print()
+    print_copilot_header(state["session"], state["registry"])
+    print()
+    _print_shell_hints()
+
+
+def _shell_help(rest, state):
+    commands = [
+        ("/help", "Show help for interactive commands"),
+        ("/model", "Show current AI model"),
+        ("/model list", "List all available models"),
+        ("/model set <id>", "Switch to a different model"),
+        ("/attach <file>", "Attach a file to the context"),
+        ("/files", "List attached files"),
+        ("/tree", "Show wiki structure"),
+        ("/clear", "Clear the screen"),
+        ("/exit, /quit", "Exit the shell"),
+        ("", ""),
+        ("apply", "Apply pending actions"),
+        ("reject", "Reject pending actions"),
+    ]
+
+    last_content = []
+    for cmd_name, desc in commands:
+        if cmd_name:
+            spacing = 30 - len(cmd_name)
+            if spacing < 2:
+                spacing = 2
+            last_content.append(f"  {Colors.BRIGHT_WHITE}{cmd_name}{Colors.RESET}{' ' * spacing}{Colors.DIM}{desc}{Colors.RESET}")
+        else:
+            last_content.append("")
+
+    # Add to conversation history
+    state["last_content"] = last_content
+    state["conversation"].append(last_content)
+
+
+def _shell_model(rest, state):
+    registry = state["registry"]
+    s = state["session"]
+    sub, _, arg = rest.partition(" ")
+
+    if not sub:
+        provider = registry.get_provider(s.get("active_provider_id"))
+        last_content = [
+            f"  {Colors.BRIGHT_WHITE}Model:{Colors.RESET} {provider.id}",
+            f"  {Colors.DIM}Provider:{Colors.RESET} {provider.provider}",
+            f"  {Colors.DIM}Type:{Colors.RESET} {'Reasoning' if provider.reasoning else 'Text'}",
+        ]
+        if provider.description:
+            last_content.append(f"  {Colors.DIM}{provider.description}{Colors.RESET}")
+        state["last_content"] = last_content
+        state["conversation"].append(last_content)
+        return
+
+    if sub == "list":
+        last_content = []
+        for provider_id, provider in registry.list_providers().items():
+            is_active = (provider_id == s.get("active_provider_id"))
+            marker = f"{Colors.BRIGHT_WHITE}▌{Colors.RESET}" if is_active else " "
+            reasoning_tag = f"{Colors.YELLOW}[R]{Colors.RESET}" if provider.reasoning else ""
+
+            last_content.append(f"{marker} {Colors.BRIGHT_WHITE}{provider_id}{Colors.RESET} {reasoning_tag}")
+            if provider.description and is_active:
+                last_content.append(f"  {Colors.DIM}{provider.description}{Colors.RESET}")
+
+        last_content.append("")
+        last_content.append(f"  {Colors.DIM}Use /model set <id> to switch{Colors.RESET}")
+        state["last_content"] = last_content
+        state["conversation"].append(last_content)
+        return
+
+    if sub == "set":
+        new_provider_id = arg.strip()
+        if not new_provider_id:
+            print(f"  {Colors.DIM}Usage: /model set <id>{Colors.RESET}")
+            return
+        try:
+            from tools.session.manager import set_active_provider
+            set_active_provider(new_provider_id)
+            state["session"] = load_session()
+            provider = registry.get_provider(new_provider_id)
+
+            print_copilot_separator()
+            print(f"  {Colors.BRIGHT_WHITE}✓{Colors.RESET} Model switched to {provider.id}")
+            # The model label in the header changed - show the updated panel
+            print()
+            print_copilot_header(state["session"], registry)
+        except Exception as e:
+            print_copilot_separator()
+            print(f"  {Colors.RED}✗{Colors.RESET} Error: {e}")
+        return
+
+    print(f"  {Colors.DIM}Usage: /model [list | set <id>]{Colors.RESET}")
+
+
+def _shell_attach(rest, state):
+    if not rest:
+        print(f"  {Colors.DIM}Usage: /attach <file>{Colors.RESET}")
+        return
+    try:
+        attach_file(rest)
+        print_copilot_separator()
+        print(f"  {Colors.BRIGHT_WHITE}✓{Colors.RESET} File attached: {Colors.DIM}{rest}{Colors.RESET}")
+    except Exception as e:
+        print_copilot_separator()
+        print(f"  {Colors.RED}✗{Colors.RESET} Error: {e}")
+
+
+def _shell_tree(rest, state):
+    print_copilot_separator()
+    if not WIKI_DIR.exists():
+        print(f"  {Colors.DIM}Wiki is empty{Colors.RESET}")
+        return
+
+    lines = []
+    for depth, name, files in _iter_tree(WIKI_DIR):
+        indent = "  " * depth
+        if depth:
+            lines.append(f"  {indent}📂 {name}")
+        lines.extend(f"  {indent}  📄 {f}" for f in files)
+    if lines:
+        _render(lines)
+
+
+def _shell_files(rest, state):
+    s = state["session"] = load_session()
+    files = s.get("files", {})
+    print_copilot_separator()
+    if files:
+        for f in files:
+            print(f"  {Colors.BRIGHT_WHITE}@{Colors.RESET} {Colors.DIM}{f}{Colors.RESET}")
+    else:
+        print(f"  {Colors.DIM}No files attached{Colors.RESET}")
+
+
+def _shell_apply(rest, state):
+    s = state["session"] = load_session()
+    actions = s.get("pending_actions", [])
+    if not actions:
+        print_copilot_separator()
+        print(f"  {Colors.DIM}No pending actions{Colors.RESET}")
+        return
+
+    from tools.ai.assistant import Action
+    from tools.session.manager import save_session
+    print_copilot_separator()
+    apply_actions([Action(**a) for a in actions], s["write"])
+    s["pending_actions"] = []
+    save_session(s)
+    state["last_options"] = []
+
+
+def _shell_reject(rest, state):
+    from tools.session.manager import save_session
+    s = state["session"] = load_session()
+    s["pending_actions"] = []
+    save_session(s)
+    print_copilot_separator()
+    print(f"  {Colors.RED}✗{Colors.RESET} Pending actions rejected")
+    state["last_options"] = []
+
+
+_CMD_HANDLERS = {
+    "/clear": _shell_clear,
+    "/cls": _shell_clear,
+    "help": _shell_help,
+    "/help": _shell_help,
+    "/model": _shell_model,
+    "/attach": _shell_attach,
+    "/tree": _shell_tree,
+    "/files": _shell_files,
+    "apply": _shell_apply,
+    "reject": _shell_reject,
+}
+
+
 def session_shell():
     from tools.ai.assistant import run_ai
 
@@ -456,32 +778,24 @@ def session_shell():
                 ("reject", "Reject pending actions"),
             ]
 
+            # Sorted, so the commands sharing a prefix are one contiguous
+            # bisect range (same scheme as the other shells' completers)
+            shell_commands.sort()
+            command_keys = [cmd for cmd, _ in shell_commands]
+
             class ShellCompleter(Completer):
                 def get_completions(self, document, complete_event):
                     text = document.text_before_cursor
-
-                    # Always show completions if text is empty or starts with "/"
-                    if not text or text == "/" or text.startswith("/"):
-                        for cmd, desc in shell_commands:
-                            if cmd.startswith(text if text else ""):
-                                # Calculate how much to replace
-                                start_pos = -len(text) if text else 0
-                                yield Completion(
-                                    cmd,
-                                    start_position=start_pos,
-                                    display=cmd,
-                                    display_meta=desc
-                                )
-                    else:
-                        # Also show non-slash commands
-                        for cmd, desc in shell_commands:
-                            if cmd.startswith(text):
-                                yield Completion(
-                                    cmd,
-                                    start_position=-len(text),
-                                    display=cmd,
-                                    display_meta=desc
-                                )
+                    i = bisect.bisect_left(command_keys, text)
+                    for cmd, desc in shell_commands[i:]:
+                        if not cmd.startswith(text):
+                            break
+                        yield Completion(
+                            cmd,
+                            start_position=-len(text),
+                            display=cmd,
+                            display_meta=desc
+                        )
 
             history_file = BASE_DIR / ".session_shell_history"
             session_prompt = PromptSession(
@@ -503,34 +817,42 @@ def session_shell():
         print(f"{Colors.YELLOW}ℹ️  prompt_toolkit nicht installiert{Colors.RESET}")
         print(f"{Colors.DIM}  Installiere mit: pip install prompt_toolkit{Colors.RESET}\n")
 
-    last_options = []
-    last_content = []
-    conversation_history = []  # Store all conversation turns
+    from tools.ai.providers import get_provider_registry
 
-    # Initial render
+    # Mutable shell state shared with the command handlers
+    state = {
+        "session": s,
+        # Looked up once; every panel redraw and /model command reuses it
+        "registry": get_provider_registry(),
+        "conversation": [],  # Store all conversation turns
+        "last_content": [],
+        "last_options": [],
+        "rendered_turns": 0,  # conversation turns already on screen
+    }
+    conversation_history = state["conversation"]
+
+    # Initial render - the header and hints are only redrawn on /clear
     print()
-    print_copilot_header(s)
+    print_copilot_header(s, state["registry"])
     print()
+    _print_shell_hints()
 
     while True:
         # Get current terminal width (dynamic - fresh on each iteration)
         term_width, _ = get_terminal_size()
 
-        # Render conversation history (between header and input)
-        if conversation_history:
-            print()
-            for turn in conversation_history:
-                for line in turn:
-                    print(line)
-                print()
-
-        # Print footer hints
-        print(f"{Colors.DIM}Try \"/help\" for commands{Colors.RESET}")
-        print(f"{Colors.DIM}? for shortcuts{Colors.RESET}")
-        print()
+        # Render only the conversation turns added since the last prompt
+        rendered_turns = state["rendered_turns"]
+        if rendered_turns < len(conversation_history):
+            lines = [""]
+            for turn in conversation_history[rendered_turns:]:
+                lines.extend(turn)
+                lines.append("")
+            _render(lines)
+            state["rendered_turns"] = len(conversation_history)
 
         # Separator line BEFORE input
-        print(f"{Colors.DIM}{'─' * term_width}{Colors.RESET}")
+        print(f"{Colors.DIM}{_run(_DASHES, term_width)}{Colors.RESET}")
 
         try:
             if session_prompt:
@@ -542,7 +864,7 @@ def session_shell():
                 cmd = input().strip()
         except (EOFError, KeyboardInterrupt):
             print()
-            print(f"{Colors.DIM}{'─' * term_width}{Colors.RESET}")
+            print(f"{Colors.DIM}{_run(_DASHES, term_width)}{Colors.RESET}")
             print()
             break
 
@@ -550,7 +872,7 @@ def session_shell():
         if cmd:
             # Re-get terminal width (in case it changed during input)
             term_width, _ = get_terminal_size()
-            print(f"{Colors.DIM}{'─' * term_width}{Colors.RESET}")
+            print(f"{Colors.DIM}{_run(_DASHES, term_width)}{Colors.RESET}")
             print()
 
         if not cmd:
@@ -560,173 +882,19 @@ def session_shell():
         if cmd in ("exit", "quit", "/exit", "/quit"):
             print()
             break
-        
-        if cmd in ("/clear", "/cls"):
-            conversation_history = []
-            last_content = []
-            clear_screen()  # Only clear on explicit user request
-            # Re-print header after clear
-            print()
-            print_copilot_header(s)
-            print()
-            continue
-
-        if cmd in ("help", "/help"):
-            last_content = []
-            commands = [
-                ("/help", "Show help for interactive commands"),
-                ("/model", "Show current AI model"),
-                ("/model list", "List all available models"),
-                ("/model set <id>", "Switch to a different model"),
-                ("/attach <file>", "Attach a file to the context"),
-                ("/files", "List attached files"),
-                ("/tree", "Show wiki structure"),
-                ("/clear", "Clear the screen"),
-                ("/exit, /quit", "Exit the shell"),
-                ("", ""),
-                ("apply", "Apply pending actions"),
-                ("reject", "Reject pending actions"),
-            ]
-            
-            for cmd_name, desc in commands:
-                if cmd_name:
-                    spacing = 30 - len(cmd_name)
-                    if spacing < 2:
-                        spacing = 2
-                    last_content.append(f"  {Colors.BRIGHT_WHITE}{cmd_name}{Colors.RESET}{' ' * spacing}{Colors.DIM}{desc}{Colors.RESET}")
-                else:
-                    last_content.append("")
 
-            # Add to conversation history
-            if last_content:
-                conversation_history.append(last_content)
-            continue
-        
-        if cmd == "/model":
-            from tools.ai.providers import get_provider_registry
-            registry = get_provider_registry()
-            provider = registry.get_provider(s.get("active_provider_id"))
-            
-            last_content = [
-                f"  {Colors.BRIGHT_WHITE}Model:{Colors.RESET} {provider.id}",
-                f"  {Colors.DIM}Provider:{Colors.RESET} {provider.provider}",
-                f"  {Colors.DIM}Type:{Colors.RESET} {'Reasoning' if provider.reasoning else 'Text'}",
-            ]
-            if provider.description:
-                last_content.append(f"  {Colors.DIM}{provider.description}{Colors.RESET}")
-            continue
-        
-        if cmd == "/model list":
-            from tools.ai.providers import get_provider_registry
-            registry = get_provider_registry()
-            providers = registry.list_providers()
-            
-            last_content = []
-            for provider_id, provider in providers.items():
-                is_active = (provider_id == s.get("active_provider_id"))
-                marker = f"{Colors.BRIGHT_WHITE}▌{Colors.RESET}" if is_active else " "
-                reasoning_tag = f"{Colors.YELLOW}[R]{Colors.RESET}" if provider.reasoning else ""
-                
-                last_content.append(f"{marker} {Colors.BRIGHT_WHITE}{provider_id}{Colors.RESET} {reasoning_tag}")
-                if provider.description and is_active:
-                    last_content.append(f"  {Colors.DIM}{provider.description}{Colors.RESET}")
-            
-            last_content.append("")
-            last_content.append(f"  {Colors.DIM}Use /model set <id> to switch{Colors.RESET}")
-            continue
-        
-        if cmd.startswith("/model set "):
-            parts = cmd.split(" ", 2)
-            if len(parts) < 3:
-                print(f"  {Colors.DIM}Usage: /model set <id>{Colors.RESET}")
-                continue
-            
-            new_provider_id = parts[2]
-            try:
-                from tools.session.manager import set_active_provider, save_session
-                set_active_provider(new_provider_id)
-                s = load_session()
-                
-                from tools.ai.providers import get_provider_registry
-                registry = get_provider_registry()
-                provider = registry.get_provider(new_provider_id)
-                
-                print_copilot_separator()
-                print(f"  {Colors.BRIGHT_WHITE}✓{Colors.RESET} Model switched to {provider.id}")
-            except Exception as e:
-                print_copilot_separator()
-                print(f"  {Colors.RED}✗{Colors.RESET} Error: {e}")
-            continue
-
-        if cmd.startswith("/attach "):
-            path = cmd.split(" ", 1)[1]
-            try:
-                attach_file(path)
-                print_copilot_separator()
-                print(f"  {Colors.BRIGHT_WHITE}✓{Colors.RESET} File attached: {Colors.DIM}{path}{Colors.RESET}")
-            except Exception as e:
-                print_copilot_separator()
-                print(f"  {Colors.RED}✗{Colors.RESET} Error: {e}")
-            continue
-
-        if cmd == "/tree":
-            print_copilot_separator()
-            if not WIKI_DIR.exists():
-                print(f"  {Colors.DIM}Wiki is empty{Colors.RESET}")
-                continue
-            
-            for root, dirs, files in os.walk(WIKI_DIR):
-                level = Path(root).relative_to(WIKI_DIR).parts
-                indent = "  " * len(level)
-                if level:
-                    print(f"  {indent}📂 {Path(root).name}")
-                for f in sorted(files):
-                    if not f.startswith("."):
-                        print(f"  {indent}  📄 {f}")
-            continue
-
-        if cmd == "/files":
-            s = load_session()
-            files = s.get("files", {})
-            print_copilot_separator()
-            if files:
-                for f in files:
-                    print(f"  {Colors.BRIGHT_WHITE}@{Colors.RESET} {Colors.DIM}{f}{Colors.RESET}")
-            else:
-                print(f"  {Colors.DIM}No files attached{Colors.RESET}")
-            continue
-
-        if cmd == "apply":
-            s = load_session()
-            actions = s.get("pending_actions", [])
-            if not actions:
-                print_copilot_separator()
-                print(f"  {Colors.DIM}No pending actions{Colors.RESET}")
-                continue
-
-            from tools.ai.assistant import Action
-            print_copilot_separator()
-            apply_actions([Action(**a) for a in actions], s["write"])
-            s["pending_actions"] = []
-            from tools.session.manager import save_session
-            save_session(s)
-            last_options = []
-            continue
-
-        if cmd == "reject":
-            s = load_session()
-            s["pending_actions"] = []
-            from tools.session.manager import save_session
-            save_session(s)
-            print_copilot_separator()
-            print(f"  {Colors.RED}✗{Colors.RESET} Pending actions rejected")
-            last_options = []
+        head, _, rest = cmd.partition(" ")
+        handler = _CMD_HANDLERS.get(head)
+        # Bare words ("help", "apply") only count as commands on their own
+        if handler and (not rest or head.startswith("/")):
+            handler(rest.strip(), state)
+            s = state["session"]
             continue
 
         # Regular AI interaction
         print_copilot_separator()
         add_history(cmd)
-        s = load_session()
+        s = state["session"] = load_session()
         
         try:
             result = run_ai(cmd, s["files"], session=s)
@@ -735,7 +903,7 @@ def session_shell():
             print(f"\n{result.message}\n")
 
             if result.options:
-                last_options = result.options
+                state["last_options"] = result.options
                 print_options(result.options)
 
             if result.actions:
@@ -752,9 +920,13 @@ def session_shell():
 
 def print_main_menu():
     """Print interactive main menu"""
-    print(f"\n{Colors.BRIGHT_CYAN}{Colors.BOLD}╔{'═' * 68}╗{Colors.RESET}")
-    print(f"{Colors.BRIGHT_CYAN}{Colors.BOLD}║{Colors.RESET}  {Colors.BOLD}🧠 LinkoWiki Admin - Hauptmenü{Colors.RESET}                               {Colors.BRIGHT_CYAN}{Colors.BOLD}║{Colors.RESET}")
-    print(f"{Colors.BRIGHT_CYAN}{Colors.BOLD}╚{'═' * 68}╝{Colors.RESET}\n")
+    lines = [
+        "",
+        f"{Colors.BRIGHT_CYAN}{Colors.BOLD}╔{_EQUALS[:68]}╗{Colors.RESET}",
+        f"{Colors.BRIGHT_CYAN}{Colors.BOLD}║{Colors.RESET}  {Colors.BOLD}🧠 LinkoWiki Admin - Hauptmenü{Colors.RESET}                               {Colors.BRIGHT_CYAN}{Colors.BOLD}║{Colors.RESET}",
+        f"{Colors.BRIGHT_CYAN}{Colors.BOLD}╚{_EQUALS[:68]}╝{Colors.RESET}",
+        "",
+    ]
     
     menu_items = [
         ("Session Management", [
@@ -782,12 +954,13 @@ def print_main_menu():
     ]
     
     for section, items in menu_items:
-        print(f"  {Colors.BRIGHT_CYAN}{section}{Colors.RESET}")
+        lines.append(f"  {Colors.BRIGHT_CYAN}{section}{Colors.RESET}")
         for num, desc in items:
-            print(f"    {Colors.CYAN}{num:3}{Colors.RESET}  {desc}")
-        print()
-    
-    print()
+            lines.append(f"    {Colors.CYAN}{num:3}{Colors.RESET}  {desc}")
+        lines.append("")
+
+    lines.append("")
+    _render(lines)
 
 
 def get_menu_items():
@@ -1020,13 +1193,14 @@ def interactive_menu(force_interactive=True):
         elif choice == "4":
             s = load_session()
             if s:
+                history_count, files_count = session_counts(s)
                 print(f"\n{Colors.BRIGHT_CYAN}{Colors.BOLD}📊 Session Status{Colors.RESET}")
                 print(f"{Colors.BRIGHT_BLACK}{'─' * 70}{Colors.RESET}")
                 print(f"  {Colors.CYAN}ID:{Colors.RESET} {s['id']}")
                 print(f"  {Colors.CYAN}Modus:{Colors.RESET} {Colors.GREEN if s['write'] else Colors.RED}{'Write' if s['write'] else 'Read-only'}{Colors.RESET}")
                 print(f"  {Colors.CYAN}Gestartet von:{Colors.RESET} {s['started_by']}")
-                print(f"  {Colors.CYAN}Verlauf:{Colors.RESET} {len(s.get('history', []))} Einträge")
-                print(f"  {Colors.CYAN}Dateien:{Colors.RESET} {len(s.get('files', {}))} angehängt")
+                print(f"  {Colors.CYAN}Verlauf:{Colors.RESET} {history_count} Einträge")
+                print(f"  {Colors.CYAN}Dateien:{Colors.RESET} {files_count} angehängt")
                 print(f"  {Colors.CYAN}Ausstehende Aktionen:{Colors.RESET} {len(s.get('pending_actions', []))}")
                 print()
             else:
@@ -1126,6 +1300,57 @@ def show_detailed_help():
         print()
 
 
+# Decoded context files keyed by resolved path -> (mtime_ns, size, text)
+_FILE_CACHE: dict = {}
+
+
+def _read_cached(p: Path) -> str:
+    """Read a context file, reusing the last decoded text while it is unchanged"""
+    st = p.stat()
+    cached = _FILE_CACHE.get(p)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    text = _load_context(p, st.st_size)
+    _FILE_CACHE[p] = (st.st_mtime_ns, st.st_size, text)
+    return text
+
+
+_MMAP_THRESHOLD = 256 * 1024
+
+
+def _load_context(p: Path, size: int) -> str:
+    """Decode a context file as UTF-8 with universal newlines.
+
+    Large files are decoded straight from an mmap, so the file content is
+    not first copied into an intermediate bytes object. Decoding is strict:
+    non-UTF-8 files raise UnicodeDecodeError for the callers' "Fehler beim
+    Laden" handling, as read_text() did. CRLF/CR endings are translated like
+    text-mode reading would (only when a CR is present).
+    """
+    with p.open('rb') as f:
+        if size < _MMAP_THRESHOLD:
+            text = f.read().decode('utf-8')
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = str(mm, 'utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _handle_ai_result(result, write_mode, report_no_actions=True):
+    """Print an AI result's message and options, then apply its actions"""
+    print_assistant_message(result.message)
+    
+    if result.options:
+        print_options(result.options)
+    
+    if result.actions:
+        apply_actions(result.actions, write_mode)
+    elif report_no_actions:
+        print(f"{Colors.DIM}Keine Aktionen vorgeschlagen{Colors.RESET}\n")
+
+
 def run_single_ai_query():
     """Run a single AI query without session"""
     print(f"\n{Colors.BRIGHT_CYAN}{Colors.BOLD}🤖 Einmalige KI-Abfrage{Colors.RESET}")
@@ -1148,7 +1373,7 @@ def run_single_ai_query():
     if file_path:
         try:
             p = Path(file_path).expanduser().resolve()
-            files[p.name] = p.read_text()
+            files[p.name] = _read_cached(p)
             print(f"{Colors.GREEN}✓ Datei geladen:{Colors.RESET} {Colors.DIM}{p.name}{Colors.RESET}\n")
         except Exception as e:
             print(f"{Colors.RED}✗ Fehler beim Laden:{Colors.RESET} {e}\n")
@@ -1156,17 +1381,7 @@ def run_single_ai_query():
     
     try:
         print_user_input(prompt)
-        result = run_ai(prompt, files)
-        print_assistant_message(result.message)
-        
-        if result.options:
-            print_options(result.options)
-        
-        if result.actions:
-            from tools.ai.assistant import Action
-            apply_actions(result.actions, write)
-        else:
-            print(f"{Colors.DIM}Keine Aktionen vorgeschlagen{Colors.RESET}\n")
+        _handle_ai_result(run_ai(prompt, files), write)
     except Exception as e:
         print(f"\n{Colors.RED}✗ KI-Fehler:{Colors.RESET} {e}\n")
     
@@ -1189,7 +1404,7 @@ def search_wiki_interactive():
     if results:
         print(f"\n{Colors.GREEN}✓ {len(results)} Treffer gefunden:{Colors.RESET}\n")
         for file_path, matches in results:
-            rel_path = file_path.relative_to(WIKI_DIR)
+            rel_path = os.path.relpath(file_path, WIKI_DIR)
             print(f"{Colors.CYAN}▸{Colors.RESET} {Colors.BOLD}{rel_path}{Colors.RESET}")
             for match in matches[:3]:  # Show max 3 matches per file
                 print(f"  {Colors.DIM}{match}{Colors.RESET}")
@@ -1207,14 +1422,16 @@ def show_recent_changes():
     print(f"\n{Colors.BRIGHT_CYAN}{Colors.BOLD}📅 Letzte Änderungen{Colors.RESET}")
     print(f"{Colors.BRIGHT_BLACK}{'─' * 70}{Colors.RESET}\n")
     
-    from tools.wiki_search import list_recent_files
+    from tools.wiki_search import scan_wiki
     from datetime import datetime
     
-    recent = list_recent_files(WIKI_DIR, limit=15)
+    # Always rescan: nested edits don't change the wiki root's mtime. The
+    # fresh scan also refreshes the cache used by the statistics view.
+    _, _, recent = scan_wiki(WIKI_DIR, recent_limit=15, use_cache=False)
     
     if recent:
         for file_path, mtime in recent:
-            rel_path = file_path.relative_to(WIKI_DIR)
+            rel_path = os.path.relpath(file_path, WIKI_DIR)
             dt = datetime.fromtimestamp(mtime)
             time_str = dt.strftime("%Y-%m-%d %H:%M")
             print(f"{Colors.CYAN}▸{Colors.RESET} {rel_path} {Colors.DIM}({time_str}){Colors.RESET}")
@@ -1230,10 +1447,9 @@ def show_wiki_statistics():
     print(f"\n{Colors.BRIGHT_CYAN}{Colors.BOLD}📊 Wiki Statistiken{Colors.RESET}")
     print(f"{Colors.BRIGHT_BLACK}{'─' * 70}{Colors.RESET}\n")
     
-    from tools.wiki_search import get_category_stats, get_wiki_categories
+    from tools.wiki_search import scan_wiki
     
-    categories = get_wiki_categories(WIKI_DIR)
-    stats = get_category_stats(WIKI_DIR)
+    categories, stats, _ = scan_wiki(WIKI_DIR)
     
     if stats:
         total_files = sum(s["files"] for s in stats.values())
@@ -1305,7 +1521,7 @@ def guided_wiki_creation():
     if file_path:
         try:
             p = Path(file_path).expanduser().resolve()
-            files[p.name] = p.read_text()
+            files[p.name] = _read_cached(p)
             print(f"\n{Colors.GREEN}✓ Datei geladen:{Colors.RESET} {Colors.DIM}{p.name}{Colors.RESET}")
         except Exception as e:
             print(f"\n{Colors.YELLOW}⚠ Warnung:{Colors.RESET} {e}")
@@ -1316,17 +1532,7 @@ def guided_wiki_creation():
     print_user_input(prompt)
     
     try:
-        result = run_ai(prompt, files)
-        print_assistant_message(result.message)
-        
-        if result.options:
-            print_options(result.options)
-        
-        if result.actions:
-            from tools.ai.assistant import Action
-            apply_actions(result.actions, write)
-        else:
-            print(f"{Colors.DIM}Keine Aktionen vorgeschlagen{Colors.RESET}\n")
+        _handle_ai_result(run_ai(prompt, files), write)
     except Exception as e:
         print(f"\n{Colors.RED}✗ KI-Fehler:{Colors.RESET} {e}\n")
     
@@ -1394,7 +1600,7 @@ def main():
             if s:
                 print(f"\n{Colors.BRIGHT_CYAN}{Colors.BOLD}📊 Session Status{Colors.RESET}")
                 print(f"{Colors.BRIGHT_BLACK}{'─' * 70}{Colors.RESET}")
-                print(json.dumps(s, indent=2))
+                print(json.dumps(s, indent=2, default=dict))  # files is an AttachedFiles mapping
                 print()
             else:
                 print(f"\n{Colors.DIM}ℹ️  Keine aktive Session{Colors.RESET}\n")
@@ -1410,21 +1616,13 @@ def main():
         if args.file:
             try:
                 p = Path(args.file).expanduser().resolve()
-                files[p.name] = p.read_text()
+                files[p.name] = _read_cached(p)
             except Exception as e:
                 print(f"\n{Colors.RED}✗ Fehler beim Laden:{Colors.RESET} {e}\n")
                 return
         
         try:
-            result = run_ai(args.prompt, files)
-            print_assistant_message(result.message)
-            
-            if result.options:
-                print_options(result.options)
-            
-            if result.actions:
-                from tools.ai.assistant import Action
-                apply_actions(result.actions, args.write)
+            _handle_ai_result(run_ai(args.prompt, files), args.write, report_no_actions=False)
         except Exception as e:
             print(f"\n{Colors.RED}✗ KI-Fehler:{Colors.RESET} {e}\n")
         return
@@ -3,55 +3,314 @@
 LinkoWiki Professional Session Shell
 Rich-based TUI with auto-resize, live-updates, and professional styling
 """
+import bisect
+import heapq
+import importlib.util
+import itertools
+import math
 import os
+import queue
 import sys
 import signal
+import stat
 import subprocess
 import re
+import threading
+import time
 import glob as glob_module
+from collections import ChainMap, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Tuple
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Mapping, Tuple
 from datetime import datetime
 from difflib import get_close_matches
+from functools import lru_cache
 
 # Add project root to path
 BASE_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(BASE_DIR))
-
-# Rich imports for professional TUI
-from rich. console import Console, Group
-from rich. live import Live
+WIKI_ROOT = BASE_DIR / "wiki"  # relative action paths are resolved here
+
+GIT_INFO_TTL = 2.0  # seconds the header's branch/dirty info is reused
+GIT_FILES_TTL = 5.0  # seconds the list of git-tracked files is shared
+STREAM_FLUSH_CHARS = 64  # streamed text is written in batches of at least this...
+STREAM_FLUSH_INTERVAL = 0.016  # ...or after this many seconds (one frame)
+
+FILE_CACHE_MAX_BYTES = 8 * 1024 * 1024  # file contents kept by _read_file (LRU)
+SINGLE_READ_MAX_BYTES = 1024 * 1024  # smaller files are read in one syscall
+PARALLEL_READ_MIN = 5  # @dir/ and @glob loads of this many files read in threads
+PARALLEL_READ_WORKERS = 8
+PREVIEW_MAX_CHARS = 200  # action previews are a glance, not a review
+CONVERSATION_PANEL_TURNS = 5  # turns shown in the conversation panel
+
+_FILE_MENTION_RE = re.compile(r'@(\S+)')
+# Files named in a request without @ (used by _detect_auto_files): paths
+# with a known extension, or well-known extensionless files; one pass
+_AUTO_FILE_RE = re.compile(
+    r'\b([\w\-/]+\.(?:py|js|ts|jsx|tsx|md|txt|json|yaml|yml|toml|ini|cfg|sh)'
+    r'|Dockerfile|Makefile)\b',
+    re.IGNORECASE
+)
+# Requests that trigger auto-detection / loading of the project's key files
+_AUTO_DETECT_RE = re.compile(r'dokumentiere|erstelle wiki', re.IGNORECASE)
+_PROJECT_CONTEXT_RE = re.compile(r'projekt|project|wiki für dieses|dokumentiere das', re.IGNORECASE)
+# Loaded for project documentation requests (when present)
+_PROJECT_CONTEXT_FILES = ("README.md", "pyproject.toml", "package.json", "requirements.txt")
+
+# File suffix -> completion icon / syntax highlighting language
+_EXT_ICON = {
+    '.py': '🐍',
+    '.js': '💛', '.ts': '💛', '.jsx': '💛', '.tsx': '💛',
+    '.md': '📝', '.txt': '📝',
+    '.json': '⚙️', '.yaml': '⚙️', '.yml': '⚙️',
+}
+# Markup for the pending-actions table; other types are shown unstyled
+_ACTION_TYPE_STYLE = {
+    'WRITE': '[green]WRITE[/green]',
+    'EDIT': '[yellow]EDIT[/yellow]',
+    'DELETE': '[red]DELETE[/red]',
+}
+# Follow-up topics suggested after writing an entry in one of these categories
+_RELATED_TOPICS = {
+    'docker': ('kubernetes', 'docker-compose', 'containerization'),
+    'kubernetes': ('helm', 'kubectl', 'k8s-networking'),
+    'python': ('pip', 'virtualenv', 'pytest'),
+    'linux': ('bash', 'systemd', 'networking'),
+    'git': ('github', 'gitlab', 'git-workflow'),
+}
+# Topics whose mention in new content suggests a cross-reference entry
+_CROSS_REFERENCE_TOPICS = ('docker', 'kubernetes', 'python', 'linux', 'git', 'aws', 'azure')
+# Finds all of them in one pass (no topic's suffix starts another, so
+# non-overlapping matching can't hide one)
+_CROSS_REFERENCE_RE = re.compile('|'.join(map(re.escape, _CROSS_REFERENCE_TOPICS)), re.IGNORECASE)
+# Flattens an action's content into its one-line table preview in one pass
+_PREVIEW_FLATTEN = str.maketrans("\n\r\t", "   ")
+# Assistant messages containing any of these are rendered as Markdown
+_MD_MARKERS = ("```", "#")
+
+_EXT_LANG = {
+    '.py': 'python',
+    '.js': 'javascript', '.ts': 'javascript',
+    '.json': 'json',
+    '.yaml': 'yaml', '.yml': 'yaml',
+}
+
+# Rich imports for professional TUI. Only what the shell needs to draw its
+# frame is imported here; Markdown, Syntax and Progress pull in markdown-it,
+# pygments and the live-display machinery and are imported on first use.
+from rich.console import Console, Group
 from rich.panel import Panel
 from rich.table import Table
-from rich.markdown import Markdown
-from rich.syntax import Syntax
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich. layout import Layout
 from rich.text import Text
-from rich.style import Style
 from rich import box
-from rich. columns import Columns
 from rich.rule import Rule
 
-# Prompt toolkit for advanced input
+# Prompt toolkit for advanced input. Importing it takes longer than the rest
+# of the shell, so only its presence is checked here; it is imported when the
+# input prompt is first set up.
+PROMPT_TOOLKIT_AVAILABLE = importlib.util.find_spec("prompt_toolkit") is not None
+
+# libgit2 bindings for in-process git queries; the git CLI is used without them
 try:
-    from prompt_toolkit import PromptSession
-    from prompt_toolkit.completion import Completer, Completion
-    from prompt_toolkit.history import FileHistory
-    from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
-    from prompt_toolkit.formatted_text import HTML
-    PROMPT_TOOLKIT_AVAILABLE = True
-except ImportError: 
-    PROMPT_TOOLKIT_AVAILABLE = False
+    import pygit2
+    PYGIT2_AVAILABLE = True
+except ImportError:
+    PYGIT2_AVAILABLE = False
 
 # Project imports
-from tools. session. manager import load_session, start_session, add_history, save_session
-from tools.ai. assistant import run_ai, run_ai_streaming, Action
+from tools.session.manager import load_session, start_session, add_history, save_session
 from tools.memory.context import ContextMemory
 
+if TYPE_CHECKING:
+    from tools.ai.assistant import Action
+
+
+# The AI stack (pydantic_ai, provider SDKs) is imported on the first request,
+# so the shell is up before it has loaded.
+def run_ai(prompt: str, files, session: dict = None):
+    """Run the assistant (see tools.ai.assistant.run_ai)"""
+    from tools.ai.assistant import run_ai as _run_ai
+    return _run_ai(prompt, files, session=session)
+
+
+def run_ai_stream(prompt: str, files, session: dict = None):
+    """Stream the assistant's answer (see tools.ai.assistant.run_ai_stream)"""
+    from tools.ai.assistant import run_ai_stream as _run_ai_stream
+    return _run_ai_stream(prompt, files, session=session)
+
+
+def _open_git_repo():
+    """Open the project repository with pygit2 (None without pygit2 or repo)"""
+    if not PYGIT2_AVAILABLE:
+        return None
+    try:
+        return pygit2.Repository(str(BASE_DIR))
+    except (pygit2.GitError, KeyError):
+        return None
+
+
+# Keeps git from flashing a console window on Windows (0 elsewhere)
+_GIT_CREATIONFLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+def _git(*args: str, timeout: float = 2) -> Optional[bytes]:
+    """Run git in BASE_DIR and return its raw stdout (None on any failure)
+
+    Output stays bytes so callers decode once; stderr isn't piped at all.
+    """
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=BASE_DIR,
+            timeout=timeout,
+            creationflags=_GIT_CREATIONFLAGS
+        )
+    except (subprocess.SubprocessError, OSError):
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+# Git-tracked files, shared by completion and @file / error-hint lookups
+_GIT_FILES_CACHE: Dict[str, Any] = {"ts": 0.0, "files": [], "lower": []}
+
+
+def _get_git_files() -> List[str]:
+    """Paths tracked by git (relative to BASE_DIR), cached for GIT_FILES_TTL"""
+    now = time.monotonic()
+    if _GIT_FILES_CACHE["ts"] and now - _GIT_FILES_CACHE["ts"] < GIT_FILES_TTL:
+        return _GIT_FILES_CACHE["files"]
+
+    files = None
+    repo = _open_git_repo()
+    if repo is not None:
+        try:
+            files = [entry.path for entry in repo.index]
+        except pygit2.GitError:
+            pass  # fall back to the git CLI
+    if files is None:
+        out = _git("ls-files", "-z")
+        files = [f for f in out.decode("utf-8", "replace").split("\0") if f] if out else []
+
+    _GIT_FILES_CACHE["ts"] = now
+    _GIT_FILES_CACHE["files"] = files
+    _GIT_FILES_CACHE["lower"] = [(f.lower(), f) for f in files]
+    return files
+
+
+def _get_git_files_lower() -> List[Tuple[str, str]]:
+    """(lowercased path, path) pairs for the files of _get_git_files()"""
+    _get_git_files()
+    return _GIT_FILES_CACHE["lower"]
+
+
+_WORD_BOUNDARY = frozenset("/_-. ")
+
+
+def _fuzzy_score(needle: str, haystack: str) -> Optional[float]:
+    """Score needle's characters appearing in order in haystack (fzf v1 style)
+
+    Both strings are expected lowercased. Gaps between matched characters
+    cost sqrt(gap) + 1, matches at the start of a path component or word
+    earn a bonus, and longer paths rank slightly lower. Lower is better;
+    None means the characters do not all occur in order.
+    """
+    score = 0.0
+    pos = -1
+    for ch in needle:
+        i = haystack.find(ch, pos + 1)
+        if i < 0:
+            return None
+        gap = i - pos - 1
+        if gap:
+            score += math.sqrt(gap) + 1.0
+        if i == 0 or haystack[i - 1] in _WORD_BOUNDARY:
+            score -= 0.5
+        pos = i
+    return score + len(haystack) * 0.01
+
+
+def _invalidate_git_files():
+    """Make the next _get_git_files() call ask git again"""
+    _GIT_FILES_CACHE["ts"] = 0.0
+
+
+@lru_cache(maxsize=None)
+def _preview_lexer(lang: str):
+    """Pygments lexer for a preview language, resolved once per language
+
+    Syntax looks a lexer name up again every time it renders; given the
+    lexer object it doesn't. Falls back to the name (plain text) if unknown.
+    """
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+    try:
+        # Same options Syntax uses for lexers it resolves itself
+        return get_lexer_by_name(lang, stripnl=False, ensurenl=True, tabsize=4)
+    except ClassNotFound:
+        return lang
+
+
+@lru_cache(maxsize=None)
+def _lex_once_syntax_class():
+    """Syntax subclass that runs Pygments once, not on every render
+
+    Keeping a Syntax object alone doesn't help: it lexes its code again each
+    time it is rendered. (Defined lazily, like the rest of rich.syntax.)
+    """
+    from rich.syntax import Syntax
+
+    class LexOnceSyntax(Syntax):
+        _lexed = None  # ((code, line_range), highlighted Text)
+
+        def highlight(self, code, line_range=None):
+            key = (code, line_range)
+            if self._lexed is None or self._lexed[0] != key:
+                self._lexed = (key, super().highlight(code, line_range))
+            return self._lexed[1].copy()
 
-class ProfessionalCompleter(Completer):
-    """Professional auto-completer for files and commands"""
+    return LexOnceSyntax
+
+
+@lru_cache(maxsize=32)
+def _preview_syntax(content: str, lang: str, code_width: int):
+    """Build (and keep) the highlighted preview for an action's content"""
+    return _lex_once_syntax_class()(content, _preview_lexer(lang), theme="monokai",
+                                    line_numbers=True, word_wrap=False, code_width=code_width)
+
+
+@lru_cache(maxsize=CONVERSATION_PANEL_TURNS)
+def _message_markdown(message: str):
+    """Parse an assistant message as Markdown once
+
+    The response panel and the conversation panel render the same message;
+    Markdown parses on construction, so both share one object.
+    """
+    from rich.markdown import Markdown
+    return Markdown(message)
+
+
+@lru_cache(maxsize=256)
+def _format_size(size: int) -> str:
+    """Size column text for /files (attached files keep their sizes)"""
+    if size > 1024:
+        return f"{size/1024:.1f} KB"
+    return f"{size:,} bytes"
+
+
+# Spacer between conversation turns (renderables are immutable when printed)
+_BLANK = Text("")
+
+
+class ProfessionalCompleter:
+    """Professional auto-completer for files and commands
+
+    Implements prompt_toolkit's Completer interface (get_completions) without
+    subclassing it, so defining it doesn't import prompt_toolkit; run() wraps
+    it in a ThreadedCompleter.
+    """
 
     COMMANDS = [
         ("/help", "📚 Show all commands"),
@@ -69,70 +328,76 @@ class ProfessionalCompleter(Completer):
         ("apply", "✅ Apply pending actions"),
         ("reject", "❌ Reject pending actions"),
     ]
+    _COMMANDS_SORTED = sorted(COMMANDS)
+    _COMMAND_KEYS = [cmd for cmd, _ in _COMMANDS_SORTED]
+
+    MAX_FILE_COMPLETIONS = 50  # the menu only shows a page anyway
+    MENTION_WINDOW = 256  # chars before the cursor searched for an @ mention
 
     def __init__(self):
-        self.files_cache: List[str] = []
+        # Sorted (path, display_meta) pairs, so completions can bisect to the
+        # prefix range and yield without per-keystroke suffix dispatch
+        self.files_cache: List[Tuple[str, str]] = []
         self._update_files_cache()
 
     def _update_files_cache(self):
         """Update git-tracked files cache"""
-        try:
-            result = subprocess.run(
-                ["git", "ls-files"],
-                capture_output=True,
-                text=True,
-                cwd=BASE_DIR,
-                timeout=2
-            )
-            if result.returncode == 0:
-                self.files_cache = [
-                    f for f in result. stdout.strip().split('\n')
-                    if f and not f.startswith('.')
-                ]
-        except: 
-            self.files_cache = []
+        self._set_files(_get_git_files())
+
+    def _set_files(self, paths):
+        """Build files_cache from tracked paths (hidden files are skipped)"""
+        meta_by_icon: Dict[str, str] = {}  # one shared meta string per icon
+        files = []
+        for path in paths:
+            if path and not path.startswith('.'):
+                icon = self.get_file_icon(path)
+                meta = meta_by_icon.get(icon)
+                if meta is None:
+                    meta = meta_by_icon[icon] = f"{icon} File"
+                files.append((path, meta))
+        files.sort()
+        self.files_cache = files
 
     def get_file_icon(self, file_path: str) -> str:
         """Get emoji icon for file type"""
-        if file_path.endswith('.py'):
-            return '🐍'
-        elif file_path.endswith(('.js', '.ts', '.jsx', '. tsx')):
-            return '💛'
-        elif file_path.endswith(('.md', '.txt')):
-            return '📝'
-        elif file_path. endswith(('.json', '.yaml', '.yml')):
-            return '⚙️'
-        else:
-            return '📄'
+        return _EXT_ICON.get(os.path.splitext(file_path)[1], '📄')
 
     def get_completions(self, document, complete_event):
+        from prompt_toolkit.completion import Completion
+
         text = document.text_before_cursor
 
-        # File mentions with @
-        if '@' in text: 
-            at_pos = text. rfind('@')
+        # File mentions with @ (only the end of long inputs is scanned; a
+        # mention further back than that can't be one being typed)
+        at_pos = text.rfind('@', max(len(text) - self.MENTION_WINDOW, 0))
+        if at_pos != -1:
             file_prefix = text[at_pos + 1:]
 
-            for file_path in self.files_cache:
-                if file_path. startswith(file_prefix):
-                    emoji = self.get_file_icon(file_path)
-                    yield Completion(
-                        file_path,
-                        start_position=-len(file_prefix),
-                        display=file_path,
-                        display_meta=f"{emoji} File"
-                    )
+            files = self.files_cache
+            start = bisect.bisect_left(files, (file_prefix,))
+            for file_path, meta in itertools.islice(files, start, start + self.MAX_FILE_COMPLETIONS):
+                if not file_path.startswith(file_prefix):
+                    break
+                yield Completion(
+                    file_path,
+                    start_position=-len(file_prefix),
+                    display=file_path,
+                    display_meta=meta
+                )
 
         # Slash commands
         elif text. startswith('/') or not text:
-            for cmd, desc in self. COMMANDS:
-                if cmd. startswith(text if text else '/'):
-                    yield Completion(
-                        cmd,
-                        start_position=-len(text) if text else 0,
-                        display=cmd,
-                        display_meta=desc
-                    )
+            prefix = text if text else '/'
+            start = bisect.bisect_left(self._COMMAND_KEYS, prefix)
+            for cmd, desc in itertools.islice(self._COMMANDS_SORTED, start, None):
+                if not cmd.startswith(prefix):
+                    break
+                yield Completion(
+                    cmd,
+                    start_position=-len(text) if text else 0,
+                    display=cmd,
+                    display_meta=desc
+                )
 
 
 class RichSessionShell:
@@ -145,10 +410,39 @@ class RichSessionShell:
         self.is_processing = False
         self. current_task = None
         self.attached_files: Dict[str, str] = {}  # filename -> content
+        # filename -> (mtime_ns, size, content), least recently used first
+        self._file_cache: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        self._file_cache_bytes = 0
+        self._file_cache_lock = threading.Lock()  # bulk loads read in threads
         self.streaming_enabled = False  # Disable streaming by default due to structured output requirements
         self.last_displayed_turn = -1  # Track which turn was last displayed to avoid duplicates
         self.autoexec_enabled = False  # Auto-execute actions without confirmation
         self.memory = ContextMemory()  # Contextual memory system
+        # Session changes are written once per prompt turn (_flush_session)
+        self._session_dirty = False
+        # remember_action persists to disk; it runs on a worker thread
+        self._memory_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._memory_thread: Optional[threading.Thread] = None
+        # Renderables of the most recent turns, built once when a turn is added
+        self._turn_renderables: deque = deque(maxlen=CONVERSATION_PANEL_TURNS)
+        self._prerendered_count = 0  # turns of conversation_history already rendered
+        # Lowercased turn contents for search_conversation, caught up lazily
+        self._history_lower: List[str] = []
+        # Output is append-only: turns already on screen (echoed at the prompt
+        # or displayed as a response) are never repainted
+        self._shown_turns = 0
+        self._git_info_cache = (0.0, None)  # (monotonic timestamp, info)
+        self._git_repo = _open_git_repo()
+        self._registry = None  # see _get_registry()
+        self._home = os.path.expanduser("~")
+        self._short_cwd = self._shorten_path(os.getcwd())
+        self._provider_id = "unknown"  # snapshotted by _snapshot_session_info()
+        self._mode = "Unknown"
+        self._header_cache = None  # (key, Panel)
+        self._footer_cache = None
+        # Rules take the console width when rendered, so one instance serves
+        # every redraw (and survives resizes)
+        self._input_rule = Rule(style="dim cyan")
 
         # Terminal info
         self.update_terminal_size()
@@ -159,6 +453,37 @@ class RichSessionShell:
     def _handle_resize(self, signum, frame):
         """Handle terminal resize - Rich handles this automatically"""
         self.update_terminal_size()
+        self._invalidate_frame_cache()
+
+    def _invalidate_frame_cache(self):
+        """Drop the cached header/footer so the next draw rebuilds them"""
+        self._header_cache = None
+        self._footer_cache = None
+
+    def _shorten_path(self, path: str) -> str:
+        """Abbreviate the home directory as ~"""
+        return "~" + path[len(self._home):] if path.startswith(self._home) else path
+
+    def _get_registry(self):
+        """Provider registry, imported and loaded on first use"""
+        if self._registry is None:
+            from tools.ai.providers import get_provider_registry
+            self._registry = get_provider_registry()
+        return self._registry
+
+    def _snapshot_session_info(self):
+        """Copy the header's provider/mode out of the session
+
+        Called whenever the session is loaded or changed, so drawing the
+        header never has to go through the provider registry.
+        """
+        self._provider_id = "unknown"
+        self._mode = "Unknown"
+        if self.session:
+            provider = self._get_registry().get_provider(self.session.get("active_provider_id"))
+            self._provider_id = provider.id.replace("openai-", "").replace("anthropic-", "")
+            self._mode = "Write" if self.session.get("write") else "Read-only"
+        self._invalidate_frame_cache()
 
     def update_terminal_size(self):
         """Update terminal dimensions"""
@@ -167,31 +492,73 @@ class RichSessionShell:
         self.term_height = size. height
 
     def _read_file(self, filepath: str) -> Optional[str]:
-        """Read file content from disk"""
+        """Read file content from disk (unchanged files come from the cache)"""
         try:
             file_path = BASE_DIR / filepath
-            if file_path.exists() and file_path. is_file():
+            st = file_path.stat()
+            if not stat.S_ISREG(st.st_mode):
+                return None
+
+            with self._file_cache_lock:
+                cached = self._file_cache.get(filepath)
+                if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                    self._file_cache.move_to_end(filepath)
+                    return cached[2]
+
+            if st.st_size <= SINGLE_READ_MAX_BYTES:
+                # One read() of the whole file, no text-layer buffering;
+                # newlines are normalized like text mode would
+                content = file_path.read_bytes().decode('utf-8')
+                if '\r' in content:
+                    content = content.replace('\r\n', '\n').replace('\r', '\n')
+            else:
                 with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
+                    content = f.read()
+            self._cache_file(filepath, st.st_mtime_ns, st.st_size, content)
+            return content
+        except (FileNotFoundError, NotADirectoryError):
+            pass
         except Exception as e: 
             self.console.print(f"[red]Error reading file {filepath}: {str(e)}[/red]")
         return None
 
+    def _cache_file(self, filepath: str, mtime_ns: int, size: int, content: str):
+        """Remember file content, evicting least recently read files over the cap"""
+        with self._file_cache_lock:
+            old = self._file_cache.pop(filepath, None)
+            if old is not None:
+                self._file_cache_bytes -= old[1]
+            self._file_cache[filepath] = (mtime_ns, size, content)
+            self._file_cache_bytes += size
+            while self._file_cache_bytes > FILE_CACHE_MAX_BYTES and len(self._file_cache) > 1:
+                _, (_, evicted_size, _) = self._file_cache.popitem(last=False)
+                self._file_cache_bytes -= evicted_size
+
+    def _read_files(self, filepaths: List[str]) -> List[Optional[str]]:
+        """_read_file for several files; larger batches are read concurrently"""
+        if len(filepaths) < PARALLEL_READ_MIN:
+            return [self._read_file(f) for f in filepaths]
+        with ThreadPoolExecutor(max_workers=PARALLEL_READ_WORKERS) as pool:
+            return list(pool.map(self._read_file, filepaths))
+
+    def _refresh_attached_files(self):
+        """Pick up edits to attached files; only changed files are re-read"""
+        for filepath in list(self.attached_files):
+            content = self._read_file(filepath)
+            if content is not None:
+                self.attached_files[filepath] = content
+
     def _find_files_fuzzy(self, pattern: str) -> List[str]:
         """Find files using fuzzy matching, glob patterns, or directory listing"""
         # Check if it's a glob pattern
         if '*' in pattern or '?' in pattern: 
-            matches = glob_module. glob(str(BASE_DIR / pattern), recursive=True)
-            return [str(Path(m).relative_to(BASE_DIR)) for m in matches if Path(m).is_file()]
+            matches = glob_module. glob(os.path.join(BASE_DIR, pattern), recursive=True)
+            return [os.path.relpath(m, BASE_DIR) for m in matches if os.path.isfile(m)]
         
         # Check if it's a directory
         dir_path = BASE_DIR / pattern
-        if dir_path. exists() and dir_path.is_dir():
-            files = []
-            for file_path in dir_path.rglob('*'):
-                if file_path.is_file() and not file_path.name.startswith('.'):
-                    files.append(str(file_path. relative_to(BASE_DIR)))
-            return files
+        if dir_path.is_dir():
+            return [os.path.relpath(p, BASE_DIR) for p in self._walk_visible_files(os.fspath(dir_path))]
         
         # Try exact match first
         file_path = BASE_DIR / pattern
@@ -199,59 +566,66 @@ class RichSessionShell:
             return [pattern]
         
         # Fuzzy matching - search for files with similar names
-        try:
-            result = subprocess.run(
-                ["git", "ls-files"],
-                capture_output=True,
-                text=True,
-                cwd=BASE_DIR,
-                timeout=2
-            )
-            if result.returncode == 0:
-                all_files = result. stdout.strip().split('\n')
-                # Find files that contain the pattern or are close matches
-                matches = []
-                pattern_lower = pattern.lower()
-                for f in all_files:
-                    if pattern_lower in f.lower():
-                        matches.append(f)
-                
-                # If we found matches, return them
-                if matches: 
-                    return matches[: 5]  # Limit to 5 fuzzy matches
-                
-                # Try get_close_matches as fallback
-                close = get_close_matches(pattern, all_files, n=3, cutoff=0.6)
-                return close
-        except (subprocess.SubprocessError, subprocess.TimeoutExpired):
-            pass
+        all_files = _get_git_files_lower()
+        # Find files that contain the pattern or are close matches
+        matches = []
+        pattern_lower = pattern.lower()
+        for f_lower, f in all_files:
+            if pattern_lower in f_lower:
+                matches.append(f)
+                if len(matches) == 5:  # Limit to 5 fuzzy matches
+                    break
         
-        return []
+        # If we found matches, return them
+        if matches: 
+            return matches
+        
+        # Fall back to the best in-order character matches; files missing
+        # any of the pattern's characters are skipped before scoring
+        needle_chars = set(pattern_lower)
+        scored = []
+        for f_lower, f in all_files:
+            if all(c in f_lower for c in needle_chars):
+                score = _fuzzy_score(pattern_lower, f_lower)
+                if score is not None:
+                    scored.append((score, f))
+        return [f for _, f in heapq.nsmallest(3, scored)]
+
+    def _walk_visible_files(self, directory: str):
+        """Yield paths of the non-hidden files below directory
+
+        os.scandir entries answer is_dir()/is_file() from the directory
+        listing, and hidden directories are pruned without being entered.
+        """
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except (PermissionError, FileNotFoundError, NotADirectoryError):
+            return
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from self._walk_visible_files(entry.path)
+            elif entry.is_file():
+                yield entry.path
 
     def _detect_auto_files(self, text: str) -> List[str]:
         """Automatically detect files mentioned in text without @ prefix"""
         files = []
         
         # Common file patterns
-        file_patterns = [
-            r'\b([\w\-/]+\.(? :py|js|ts|jsx|tsx|md|txt|json|yaml|yml|toml|ini|cfg|sh))\b',
-            r'\b(README\.md|pyproject\.toml|package\.json|Dockerfile|Makefile)\b',
-        ]
-        
-        for pattern in file_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches: 
-                # Check if file exists
-                if (BASE_DIR / match).exists():
-                    files. append(match)
+        for match in _AUTO_FILE_RE.findall(text):
+            # Check if file exists
+            if (BASE_DIR / match).exists():
+                files. append(match)
         
         return files
 
     def _extract_and_load_files(self, text:  str) -> Tuple[str, Dict[str, str]]:
         """Extract @file mentions and load their content automatically with fuzzy matching"""
         # Find all @file mentions
-        file_pattern = r'@([^\s]+)'
-        matches = re.findall(file_pattern, text)
+        matches = _FILE_MENTION_RE.findall(text)
         
         loaded_files = {}
         
@@ -268,20 +642,19 @@ class RichSessionShell:
                 # If multiple files found, show them
                 if len(found_files) > 1:
                     self.console.print(f"[dim]📎 Found {len(found_files)} matches for '{filepath}':[/dim]")
-                    for f in found_files[: 10]:  # Show max 10
+                    for f in itertools.islice(found_files, 10):  # Show max 10
                         self.console.print(f"[dim]   - {f}[/dim]")
                 
                 # Load all found files
-                for f in found_files:
-                    if f not in self.attached_files:
-                        content = self._read_file(f)
-                        if content: 
-                            loaded_files[f] = content
-                            self.attached_files[f] = content
-                            self.console.print(f"[dim]📎 Loaded: {f}[/dim]")
+                new_files = [f for f in found_files if f not in self.attached_files]
+                for f, content in zip(new_files, self._read_files(new_files)):
+                    if content: 
+                        loaded_files[f] = content
+                        self.attached_files[f] = content
+                        self.console.print(f"[dim]📎 Loaded: {f}[/dim]")
         
         # Auto-detect files mentioned without @
-        if "dokumentiere" in text.lower() or "erstelle wiki" in text.lower():
+        if _AUTO_DETECT_RE.search(text):
             auto_files = self._detect_auto_files(text)
             for f in auto_files:
                 if f not in self.attached_files:
@@ -292,10 +665,10 @@ class RichSessionShell:
                         self.console. print(f"[dim]📎 Auto-loaded: {f}[/dim]")
         
         # Context-aware loading for project documentation requests
-        if any(keyword in text.lower() for keyword in ["projekt", "project", "wiki für dieses", "dokumentiere das"]):
-            context_files = ["README.md", "pyproject.toml", "package.json", "requirements.txt"]
-            for f in context_files: 
-                if (BASE_DIR / f).exists() and f not in self.attached_files:
+        if _PROJECT_CONTEXT_RE.search(text):
+            for f in _PROJECT_CONTEXT_FILES:
+                # _read_file's stat doubles as the existence check
+                if f not in self.attached_files:
                     content = self._read_file(f)
                     if content: 
                         loaded_files[f] = content
@@ -304,89 +677,106 @@ class RichSessionShell:
         
         return text, loaded_files
 
-    def _get_git_info(self) -> Dict[str, str]: 
-        """Get git branch and status"""
-        try: 
-            # Get branch
-            result = subprocess.run(
-                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-                capture_output=True,
-                text=True,
-                cwd=BASE_DIR
+    def _get_git_info(self) -> Dict[str, str]:
+        """Get git branch and status (cached; pygit2 or one git call)"""
+        ts, info = self._git_info_cache
+        now = time.monotonic()
+        if info is not None and now - ts < GIT_INFO_TTL:
+            return info
+
+        # No HEAD/index mtime shortcut: editing a tracked file touches
+        # neither, and the dirty flag needs the status query anyway
+        info = self._git_info_pygit2() if self._git_repo is not None else None
+        if info is None:
+            info = self._git_info_subprocess()
+
+        self._git_info_cache = (now, info)
+        return info
+
+    def _git_info_pygit2(self) -> Optional[Dict[str, str]]:
+        """Branch and dirty flag read in-process (None if libgit2 fails)"""
+        repo = self._git_repo
+        try:
+            if repo.head_is_unborn:
+                return {"branch": ""}
+            branch = "HEAD" if repo.head_is_detached else repo.head.shorthand
+            is_dirty = any(
+                flags != pygit2.GIT_STATUS_CURRENT and not flags & pygit2.GIT_STATUS_IGNORED
+                for flags in repo.status().values()
             )
-            branch = result.stdout. strip() if result.returncode == 0 else ""
-
-            # Check if dirty
-            if branch: 
-                status = subprocess.run(
-                    ["git", "status", "--porcelain"],
-                    capture_output=True,
-                    text=True,
-                    cwd=BASE_DIR
-                )
-                is_dirty = bool(status.stdout. strip())
-                branch = f"{branch}*" if is_dirty else branch
-
-            return {"branch": branch}
-        except (subprocess.SubprocessError, subprocess.TimeoutExpired, FileNotFoundError):
-            return {"branch": ""}
+        except pygit2.GitError:
+            return None
+        return {"branch": f"{branch}*" if is_dirty else branch}
+
+    def _git_info_subprocess(self) -> Dict[str, str]:
+        """Branch and dirty flag from a single git status call"""
+        out = _git("status", "--porcelain=v2", "--branch", "-z")
+        branch = ""
+        is_dirty = False
+        if out:
+            for record in out.decode("utf-8", "replace").split("\0"):
+                if record.startswith("# branch.head "):
+                    branch = record[len("# branch.head "):]
+                    if branch == "(detached)":
+                        branch = "HEAD"
+                elif record and not record.startswith("#"):
+                    is_dirty = True
+
+        if branch and is_dirty:
+            branch = f"{branch}*"
+        return {"branch": branch}
 
     def _create_header_panel(self) -> Panel:
         """Create professional header panel"""
         git_info = self._get_git_info()
 
-        # Get session info
-        provider_id = "unknown"
-        mode = "Unknown"
-        if self.session:
-            from tools.ai.providers import get_provider_registry
-            registry = get_provider_registry()
-            provider = registry.get_provider(self.session.get("active_provider_id"))
-            provider_id = provider. id. replace("openai-", "").replace("anthropic-", "")
-            mode = "Write" if self.session.get("write") else "Read-only"
+        # Rebuild only when something shown in the header changed
+        key = (git_info["branch"], self.autoexec_enabled)
+        if self._header_cache is not None and self._header_cache[0] == key:
+            return self._header_cache[1]
 
         # Create header table
         table = Table. grid(padding=(0, 2))
         table.add_column(style="bold cyan", justify="left")
         table.add_column(style="dim", justify="right")
 
-        # Path and git
-        cwd = os.getcwd()
-        home = os.path. expanduser("~")
-        short_cwd = "~" + cwd[len(home):] if cwd. startswith(home) else cwd
-
         # Add autoexec badge if enabled
         badges = []
         if self. autoexec_enabled:
             badges. append("[bold yellow]⚡AUTOEXEC[/bold yellow]")
         
         left = f"[bold]LinkoWiki Code[/bold] [dim]Session[/dim]"
-        right_parts = [f"[dim]{provider_id} (1x)[/dim]"]
+        right_parts = [f"[dim]{self._provider_id} (1x)[/dim]"]
         if badges:
             right_parts.extend(badges)
         right = " ".join(right_parts)
         table.add_row(left, right)
 
         if git_info["branch"]:
-            path_text = f"{short_cwd} [{git_info['branch']}]"
+            path_text = f"{self._short_cwd} [{git_info['branch']}]"
         else:
-            path_text = short_cwd
+            path_text = self._short_cwd
 
         table.add_row(
             f"[dim]Path:[/dim] {path_text}",
-            f"[dim]Mode:[/dim] {mode}"
+            f"[dim]Mode:[/dim] {self._mode}"
         )
 
-        return Panel(
+        panel = Panel(
             table,
             border_style="cyan",
             box=box.ROUNDED,
             title="[bold]🧠 LinkoWiki[/bold]",
             title_align="left"
         )
+        self._header_cache = (key, panel)
+        return panel
 
     def _create_status_footer(self) -> Table:
         """Create status footer (without separator - drawn separately)"""
+        if self._footer_cache is not None:
+            return self._footer_cache
+
         # Calculate context usage (placeholder for now)
         context_usage = 0.13
         requests_remaining = 98.2
@@ -408,62 +798,85 @@ class RichSessionShell:
 
         table.add_row(left, middle, right)
 
+        self._footer_cache = table
         return table
 
     def _get_placeholder_text(self) -> str:
         """Get placeholder text for empty input"""
         return "Enter @ to mention files or / for commands"
 
-    def _print_input_box_top(self):
-        """Print the top separator line for input box"""
-        self.console.print(Rule(style="dim cyan"))
+    def _print_input_box_top(self, above: Optional[Panel] = None):
+        """Print the top separator line for input box (and what goes above it)"""
+        if above is not None:
+            self.console.print(Group(above, self._input_rule))
+        else:
+            self.console.print(self._input_rule)
 
     def _print_input_box_bottom_and_footer(self):
-        """Print the bottom separator line and footer after input"""
-        self.console.print(Rule(style="dim cyan"))
-        self.console.print(self._create_status_footer())
+        """Print the bottom separator line, footer and a blank line after input"""
+        self.console.print(Group(self._input_rule, self._create_status_footer(), _BLANK))
+
+    def _render_turn(self, turn: Dict[str, Any]):
+        """Build the conversation panel renderable for one turn"""
+        role = turn.get("role", "user")
+        content = turn.get("content", "")
+
+        if role == "user":
+            text = Text()
+            text.append("→ ", style="bold cyan")
+            text. append(content, style="white")
+            return text
+
+        # assistant: render as markdown if it looks like markdown
+        if any(marker in content for marker in _MD_MARKERS):
+            return _message_markdown(content)
+        text = Text()
+        text.append("← ", style="bold magenta")
+        text.append(content, style="white")
+        return text
+
+    def _append_turn(self, role: str, content: str):
+        """Add a turn to the conversation history and prerender it"""
+        self.conversation_history.append({"role": role, "content": content})
+        self._prerender_new_turns()
+
+    def _prerender_new_turns(self):
+        """Render turns appended to conversation_history since the last call"""
+        history = self.conversation_history
+        if len(history) < self._prerendered_count:
+            # History was cleared or replaced
+            self._turn_renderables.clear()
+            self._prerendered_count = 0
+        new_turns = history[self._prerendered_count:]
+        # Older ones would fall out of the deque right away
+        for turn in new_turns[-self._turn_renderables.maxlen:]:
+            self._turn_renderables.append(self._render_turn(turn))
+        self._prerendered_count = len(history)
 
     def _create_conversation_panel(self) -> Optional[Panel]:
-        """Create conversation history panel"""
+        """Create a panel with the turns that are not on screen yet"""
         if not self.conversation_history:
             return None
 
-        # Create conversation display
-        conversation_parts = []
+        # Turns are appended directly to conversation_history in places;
+        # catch up on those (a no-op when _append_turn was used)
+        self._prerender_new_turns()
 
-        # Show last 5 turns, but exclude the last one if it was just displayed
-        history_to_show = self.conversation_history[-5:]
-        
-        # If the last turn was just displayed (tracked by last_displayed_turn),
-        # don't show it again in the panel
-        if self. last_displayed_turn == len(self.conversation_history) - 1:
-            history_to_show = self.conversation_history[-6:-1] if len(self. conversation_history) > 5 else self.conversation_history[:-1]
-
-        for turn in history_to_show:
-            role = turn.get("role", "user")
-            content = turn.get("content", "")
-
-            if role == "user":
-                text = Text()
-                text.append("→ ", style="bold cyan")
-                text. append(content, style="white")
-                conversation_parts.append(text)
-            else:  # assistant
-                # Render as markdown if it looks like markdown
-                if "```" in content or "#" in content: 
-                    conversation_parts.append(Markdown(content))
-                else: 
-                    text = Text()
-                    text.append("← ", style="bold magenta")
-                    text.append(content, style="white")
-                    conversation_parts.append(text)
-
-            # Add spacing
-            conversation_parts.append(Text(""))
-
-        if not conversation_parts: 
+        # Everything up to the last displayed turn (tracked by
+        # last_displayed_turn) is already visible; don't show it again
+        shown = min(max(self._shown_turns, self.last_displayed_turn + 1),
+                    len(self.conversation_history))
+        unshown = min(len(self.conversation_history) - shown, CONVERSATION_PANEL_TURNS)
+        if unshown <= 0: 
             return None
 
+        # Show at most the last 5 new turns, each followed by a blank line
+        conversation_parts = []
+        skip = max(len(self._turn_renderables) - unshown, 0)
+        for renderable in itertools.islice(self._turn_renderables, skip, None):
+            conversation_parts.append(renderable)
+            conversation_parts.append(_BLANK)
+
         group = Group(*conversation_parts)
 
         return Panel(
@@ -506,6 +919,7 @@ class RichSessionShell:
         """Create input prompt text for prompt_toolkit"""
         # Use prompt_toolkit's HTML for colored prompt
         if PROMPT_TOOLKIT_AVAILABLE: 
+            from prompt_toolkit.formatted_text import HTML
             return HTML('<ansi-cyan><b>></b></ansi-cyan> ')
         else: 
             return "> "
@@ -528,9 +942,7 @@ class RichSessionShell:
             self.console.print("[red]No active session[/red]")
             return
 
-        from tools.ai.providers import get_provider_registry
-        registry = get_provider_registry()
-        provider = registry.get_provider(self.session. get("active_provider_id"))
+        provider = self._get_registry().get_provider(self.session. get("active_provider_id"))
 
         table = Table(show_header=False, box=box.SIMPLE)
         table.add_column(style="dim", width=15)
@@ -559,7 +971,9 @@ class RichSessionShell:
         # Store for retry capability
         if not is_retry: 
             self.last_user_input = user_input
-            self. last_files = self. attached_files.copy()
+            # Files are only ever added to attached_files (in insertion
+            # order), so its length is enough to restore it on /retry
+            self.last_files_count = len(self.attached_files)
 
         # Check for repeated patterns in memory
         pattern_hint = self. memory.detect_repeated_pattern(user_input)
@@ -571,18 +985,19 @@ class RichSessionShell:
 
         # Add user message to history
         if not is_retry:
-            self.conversation_history.append({
-                "role":  "user",
-                "content": user_input
-            })
+            self._append_turn("user", user_input)
+            self._shown_turns = len(self.conversation_history)  # echoed at the prompt
 
         try:
             # Add to session history
             if not is_retry:
                 add_history(user_input)
 
-            # Merge loaded files with session files
-            all_files = {**self.session.get("files", {}), **self.attached_files}
+            self._refresh_attached_files()
+
+            # Overlay attached files on the session files without copying;
+            # the AI layer only iterates over the items
+            all_files = ChainMap(self.attached_files, self.session.get("files", {}))
 
             if self.streaming_enabled:
                 # Streaming mode
@@ -600,9 +1015,10 @@ class RichSessionShell:
             self._handle_connection_error(str(e))
         except Exception as e:
             error_msg = str(e)
-            if "api" in error_msg.lower() and "key" in error_msg.lower():
+            error_lower = error_msg.lower()
+            if "api" in error_lower and "key" in error_lower:
                 self._handle_api_key_error()
-            elif "rate" in error_msg.lower() and "limit" in error_msg.lower():
+            elif "rate" in error_lower and "limit" in error_lower:
                 self._handle_rate_limit_error()
             else:
                 self.console.print(f"[red]❌ Error:[/red] {error_msg}")
@@ -621,23 +1037,11 @@ class RichSessionShell:
         if match:
             filename = match.group(1)
             # Find similar files
-            try:
-                result = subprocess.run(
-                    ["git", "ls-files"],
-                    capture_output=True,
-                    text=True,
-                    cwd=BASE_DIR,
-                    timeout=2
-                )
-                if result.returncode == 0:
-                    all_files = result. stdout.strip().split('\n')
-                    similar = get_close_matches(filename, all_files, n=5, cutoff=0.5)
-                    if similar:
-                        self.console.print("\n[yellow]💡 Did you mean one of these?[/yellow]")
-                        for f in similar:
-                            self.console. print(f"   [cyan]@{f}[/cyan]")
-            except:
-                pass
+            similar = get_close_matches(filename, _get_git_files(), n=5, cutoff=0.5)
+            if similar:
+                self.console.print("\n[yellow]💡 Did you mean one of these?[/yellow]")
+                for f in similar:
+                    self.console. print(f"   [cyan]@{f}[/cyan]")
 
     def _handle_connection_error(self, error_msg:  str):
         """Handle connection errors with retry option"""
@@ -666,12 +1070,14 @@ class RichSessionShell:
         self.console.print("   3. Consider upgrading your API plan")
         self.console.print("\n[dim]Typical wait time:  1-5 minutes[/dim]")
 
-    def _process_ai_standard(self, user_input: str, all_files: Dict[str, str]):
+    def _process_ai_standard(self, user_input: str, all_files: Mapping[str, str]):
         """Process AI request without streaming"""
+        from rich.progress import Progress, SpinnerColumn, TextColumn
+
         # Show processing indicator
         with Progress(
             SpinnerColumn(),
-            TextColumn("[bold magenta]{task. description}"),
+            TextColumn("[bold magenta]{task.description}"),
             console=self.console,
             transient=True
         ) as progress:
@@ -681,10 +1087,7 @@ class RichSessionShell:
             result = run_ai(user_input, all_files, session=self.session)
 
             # Add assistant response to history
-            self.conversation_history. append({
-                "role": "assistant",
-                "content":  result. message
-            })
+            self._append_turn("assistant", result.message)
             
             # Track that this turn was just displayed
             self.last_displayed_turn = len(self.conversation_history) - 1
@@ -694,55 +1097,150 @@ class RichSessionShell:
             self._display_ai_response(result.message)
             self.console.print()
             
-            # Display options if any
-            if result. options:
-                self._display_options(result.options)
+            self._handle_ai_result(result, user_input)
 
-            # Show actions if any
-            if result.actions:
-                self._display_actions(result.actions)
-                
-                # Remember actions in memory
-                for action in result.actions:
-                    self.memory.remember_action(action. dict(), user_input)
-                
-                self.session["pending_actions"] = [a.dict() for a in result.actions]
-                save_session(self. session)
+    def _handle_ai_result(self, result, user_input: str):
+        """Show options/actions of a finished AI response and follow up on them"""
+        # Display options if any
+        if result. options:
+            self._display_options(result.options)
+
+        # Show actions if any
+        if result.actions:
+            self._display_actions(result.actions)
+            
+            # Serialized once; memory and the session only read the dicts
+            action_dicts = [a.model_dump() for a in result.actions]
+
+            # Remember actions in memory (written in the background)
+            self._remember_actions(action_dicts, user_input)
+            
+            self.session["pending_actions"] = action_dicts
+            self._mark_session_dirty()
+            
+            # Auto-execute if enabled (but skip DELETE actions)
+            if self.autoexec_enabled: 
+                # Check if any actions are DELETE
+                has_delete = any(a.type. upper() == "DELETE" for a in result. actions)
                 
-                # Auto-execute if enabled (but skip DELETE actions)
-                if self.autoexec_enabled: 
-                    # Check if any actions are DELETE
-                    has_delete = any(a.type. upper() == "DELETE" for a in result. actions)
+                if has_delete:
+                    self.console. print("\n[yellow]⚠ DELETE action detected - confirmation required even in autoexec mode[/yellow]")
+                else:
+                    self.console.print("\n[bold yellow]⚡ AUTOEXEC:[/bold yellow] Executing actions automatically...")
+                    self._execute_pending_actions()
                     
-                    if has_delete:
-                        self.console. print("\n[yellow]⚠ DELETE action detected - confirmation required even in autoexec mode[/yellow]")
-                    else:
-                        self.console.print("\n[bold yellow]⚡ AUTOEXEC:[/bold yellow] Executing actions automatically...")
-                        self._execute_pending_actions()
-                        
-                        # Show proactive suggestions after auto-execution
-                        self._show_proactive_suggestions(result.actions, user_input)
-            else:
-                # Show suggestions even without actions
-                self._show_proactive_suggestions([], user_input)
+                    # Show proactive suggestions after auto-execution
+                    self._show_proactive_suggestions(result.actions, user_input)
+        else:
+            # Show suggestions even without actions
+            self._show_proactive_suggestions([], user_input)
 
-    def _process_ai_streaming(self, user_input:  str, all_files: Dict[str, str]):
+    def _process_ai_streaming(self, user_input:  str, all_files: Mapping[str, str]):
         """Process AI request with streaming output
         
-        Note: Streaming with structured output (AIResult with options) is complex. 
-        This attempts streaming but falls back to standard mode on any issues.
+        The message is written to the terminal while it is generated; options
+        and actions are shown once the structured result is complete. Falls
+        back to standard mode if the provider fails before producing output.
         """
-        # Due to complexity of streaming structured output, 
-        # use standard mode which properly handles AIResult with options
-        self. console.print("[dim]Note: Using standard mode for structured output support[/dim]")
-        self._process_ai_standard(user_input, all_files)
+        out = self.console.file
+        written = 0  # characters of the message already on screen
+        buf: List[str] = []
+        buf_len = 0
+        last_flush = time.monotonic()
+        result = None
+
+        def flush():
+            # Streamed text is plain: write it raw, never through Rich markup
+            nonlocal buf_len, last_flush
+            if buf:
+                out.write("".join(buf))
+                out.flush()
+                buf.clear()
+            buf_len = 0
+            last_flush = time.monotonic()
+
+        try:
+            for item in run_ai_stream(user_input, all_files, session=self.session):
+                if not isinstance(item, str):
+                    result = item
+                    continue
+                if len(item) <= written:
+                    continue
+                if not written:
+                    self.console.print()
+                    self.console.print("[bold magenta]←[/bold magenta] ", end="")
+                buf.append(item[written:])
+                buf_len += len(item) - written
+                written = len(item)
+                if buf_len >= STREAM_FLUSH_CHARS or time.monotonic() - last_flush >= STREAM_FLUSH_INTERVAL:
+                    flush()
+        except Exception:
+            if written:
+                flush()
+                out.write("\n")
+                raise
+        if result is None:
+            # Nothing streamed (e.g. provider without streaming support)
+            self. console.print("[dim]Note: Using standard mode for structured output support[/dim]")
+            self._process_ai_standard(user_input, all_files)
+            return
+
+        if not written:
+            self.console.print()
+            self.console.print("[bold magenta]←[/bold magenta] ", end="")
+        buf.append(result.message[written:])
+        flush()
+        out.write("\n")
+        self.console.print()
+
+        self._append_turn("assistant", result.message)
+        self.last_displayed_turn = len(self.conversation_history) - 1
+
+        self._handle_ai_result(result, user_input)
+
+    def _mark_session_dirty(self):
+        """Note that self.session changed; saved by the next _flush_session()"""
+        self._session_dirty = True
+
+    def _flush_session(self):
+        """Save the session if it changed since the last save"""
+        if self._session_dirty and self.session is not None:
+            save_session(self.session)
+        self._session_dirty = False
+
+    def _remember_actions(self, actions: List[Dict[str, Any]], prompt: str):
+        """Hand actions to the memory worker, starting it on first use"""
+        if self._memory_thread is None:
+            self._memory_thread = threading.Thread(
+                target=self._memory_worker, name="linkowiki-memory", daemon=True
+            )
+            self._memory_thread.start()
+        self._memory_queue.put((actions, prompt))
+
+    def _memory_worker(self):
+        """Persist remembered actions off the interactive loop"""
+        while True:
+            item = self._memory_queue.get()
+            if item is None:
+                return
+            actions, prompt = item
+            for action in actions:
+                self.memory.remember_action(action, prompt)
+
+    def _flush_memory(self, timeout: float = 2.0):
+        """Let the memory worker finish queued writes and save them (on exit)"""
+        if self._memory_thread is not None:
+            self._memory_queue.put(None)
+            self._memory_thread.join(timeout)
+            self._memory_thread = None
+        self.memory.flush()
 
     def _display_ai_response(self, message: str):
         """Display AI response with proper markdown and syntax highlighting"""
-        if "```" in message or "#" in message: 
+        if any(marker in message for marker in _MD_MARKERS):
             # Render as markdown with syntax highlighting
             self.console.print(Panel(
-                Markdown(message),
+                _message_markdown(message),
                 border_style="magenta",
                 box=box.ROUNDED,
                 title="[bold]Assistant[/bold]",
@@ -779,7 +1277,7 @@ class RichSessionShell:
         self.console.print(panel)
         self.console.print()
 
-    def _display_actions(self, actions:  List[Action]):
+    def _display_actions(self, actions:  List["Action"]):
         """Display pending actions with better diff visualization"""
         table = Table(show_header=True, box=box. SIMPLE_HEAD)
         table.add_column("Type", style="yellow", width=8)
@@ -787,22 +1285,15 @@ class RichSessionShell:
         table.add_column("Preview", style="dim")
 
         for action in actions:
-            action_type = action. type.upper()
             # Color-code action types
-            if action_type == "WRITE":
-                type_styled = f"[green]{action_type}[/green]"
-            elif action_type == "EDIT":
-                type_styled = f"[yellow]{action_type}[/yellow]"
-            elif action_type == "DELETE": 
-                type_styled = f"[red]{action_type}[/red]"
-            else: 
-                type_styled = action_type
+            action_type = action. type.upper()
+            type_styled = _ACTION_TYPE_STYLE.get(action_type, action_type)
             
             # Show content preview if available
             preview = ""
             if action. content:
                 # First 50 chars of content as preview
-                preview = action.content[:50]. replace("\n", " ")
+                preview = action.content[:50].translate(_PREVIEW_FLATTEN)
                 if len(action.content) > 50:
                     preview += "..."
             
@@ -820,40 +1311,39 @@ class RichSessionShell:
             subtitle="[dim]Type 'apply' to execute or 'reject' to cancel[/dim]"
         )
 
-        self.console. print(panel)
-        self.console. print()
-        
+        parts = [panel, _BLANK]
+
         # Show preview of content for edits/writes
-        for action in actions[: 3]:  # Show max 3 previews
-            if action.content and action.type in ("write", "edit"):
-                self._show_action_preview(action)
+        if self.session is None or self.session.get("preview_enabled", True):
+            for action in itertools.islice(actions, 3):  # Show max 3 previews
+                if action.content and action.type in ("write", "edit"):
+                    parts.append(self._action_preview(action))
+
+        # Table and previews go out in one render
+        self.console.print(Group(*parts))
 
-    def _show_action_preview(self, action: Action):
+    def _show_action_preview(self, action: "Action"):
         """Show preview of action content"""
+        self.console.print(self._action_preview(action))
+
+    def _action_preview(self, action: "Action") -> Panel:
+        """Panel previewing an action's content"""
+        # Truncate before the lexer sees the content
         content = action.content
-        if len(content) > 500:
-            content = content[:500] + "\n...  (truncated)"
+        if len(content) > PREVIEW_MAX_CHARS:
+            content = content[:PREVIEW_MAX_CHARS] + "\n...  (truncated)"
         
         # Detect language for syntax highlighting
-        lang = "text"
-        if action.path.endswith('. py'):
-            lang = "python"
-        elif action.path.endswith(('.js', '.ts')):
-            lang = "javascript"
-        elif action.path. endswith('.json'):
-            lang = "json"
-        elif action.path.endswith(('.yaml', '.yml')):
-            lang = "yaml"
+        lang = _EXT_LANG.get(os.path.splitext(action.path)[1], "text")
         
-        syntax = Syntax(content, lang, theme="monokai", line_numbers=True)
+        syntax = _preview_syntax(content, lang, max(self.term_width - 4, 20))
         
-        panel = Panel(
+        return Panel(
             syntax,
             title=f"[dim]Preview:  {action.path}[/dim]",
             border_style="dim",
             box=box.MINIMAL
         )
-        self.console.print(panel)
 
     def _execute_pending_actions(self):
         """Execute pending actions from session"""
@@ -862,113 +1352,164 @@ class RichSessionShell:
             return
         
         actions = self.session["pending_actions"]
-        self.console.print(f"\n[bold green]Executing {len(actions)} action(s)...[/bold green]")
+        # Status lines are collected and printed in one go after the loop
+        lines = [f"\n[bold green]Executing {len(actions)} action(s)...[/bold green]"]
+        created_dirs = set()  # parents already mkdir'ed in this batch
+
+        def ensure_parent(file_path: Path):
+            parent = file_path.parent
+            if parent not in created_dirs:
+                parent.mkdir(parents=True, exist_ok=True)
+                created_dirs.add(parent)
+
+        # A write/edit followed by another action on the same path is moot
+        last_index = {action_dict.get("path", ""): idx for idx, action_dict in enumerate(actions)}
         
-        for action_dict in actions: 
+        for idx, action_dict in enumerate(actions): 
             action_type = action_dict. get("type", "").upper()
             path = action_dict. get("path", "")
-            content = action_dict. get("content", "")
             
             file_path = WIKI_ROOT / path if not path.startswith('/') else Path(path)
+
+            if action_type in ("WRITE", "EDIT"):
+                if last_index[path] != idx:
+                    lines.append(f"[dim]Superseded by a later action: {path}[/dim]")
+                    continue
+                # Encoded once and written as bytes, bypassing the text layer
+                data = (action_dict.get("content") or "").encode('utf-8')
             
             try:
                 if action_type == "WRITE":
-                    file_path. parent.mkdir(parents=True, exist_ok=True)
-                    file_path. write_text(content, encoding='utf-8')
-                    self.console.print(f"[green]✓[/green] Written:  {path}")
+                    ensure_parent(file_path)
+                    file_path.write_bytes(data)
+                    lines.append(f"[green]✓[/green] Written:  {path}")
                     
                 elif action_type == "EDIT": 
-                    if file_path.exists():
-                        file_path.write_text(content, encoding='utf-8')
-                        self.console.print(f"[green]✓[/green] Edited:  {path}")
+                    # No O_CREAT, so opening doubles as the existence check
+                    try:
+                        fd = os.open(file_path, os.O_WRONLY | os.O_TRUNC | getattr(os, "O_BINARY", 0))
+                    except FileNotFoundError:
+                        lines.append(f"[yellow]⚠[/yellow] File not found, creating:  {path}")
+                        ensure_parent(file_path)
+                        file_path.write_bytes(data)
                     else:
-                        self.console. print(f"[yellow]⚠[/yellow] File not found, creating:  {path}")
-                        file_path. parent.mkdir(parents=True, exist_ok=True)
-                        file_path.write_text(content, encoding='utf-8')
+                        with open(fd, 'wb') as f:
+                            f.write(data)
+                        lines.append(f"[green]✓[/green] Edited:  {path}")
                         
                 elif action_type == "DELETE": 
-                    if file_path.exists():
+                    try:
                         file_path.unlink()
-                        self. console.print(f"[green]✓[/green] Deleted:  {path}")
-                    else:
-                        self.console. print(f"[dim]File already deleted: {path}[/dim]")
+                        lines.append(f"[green]✓[/green] Deleted:  {path}")
+                    except FileNotFoundError:
+                        lines.append(f"[dim]File already deleted: {path}[/dim]")
                         
             except Exception as e: 
-                self.console.print(f"[red]✗[/red] Failed to {action_type. lower()} {path}: {str(e)}")
+                lines.append(f"[red]✗[/red] Failed to {action_type. lower()} {path}: {str(e)}")
         
-        # Clear pending actions
+        # Wiki content changed: drop cached category stats
+        from tools.wiki_search import invalidate_cache
+        invalidate_cache()
+
+        # Clear pending actions and save right away: a deferred save would
+        # let a crash replay the executed actions on the next load
         self.session["pending_actions"] = []
-        save_session(self. session)
-        self.console. print("\n[bold green]✓ All actions completed[/bold green]")
+        save_session(self.session)
+        self._session_dirty = False
+        lines.append("\n[bold green]✓ All actions completed[/bold green]")
+        self.console.print("\n".join(lines))
 
-    def _show_proactive_suggestions(self, actions: List[Action], prompt: str):
+    def _show_proactive_suggestions(self, actions: List["Action"], prompt: str):
         """Generate and display proactive suggestions based on context"""
-        suggestions = []
+        # Keyed by (type, label): the same suggestion from several actions is
+        # kept once, in first-seen order. Only the first 3 are ever shown.
+        suggestions: Dict[Tuple[str, str], Dict[str, str]] = {}
+        max_suggestions = 3
+
+        def suggest(suggestion: Dict[str, str]):
+            suggestions.setdefault((suggestion['type'], suggestion['label']), suggestion)
         
         # Check wiki structure for suggestions
         try:
-            from tools.ai.tools. wiki_tools import get_wiki_structure, WIKI_ROOT
+            from tools.ai.tools. wiki_tools import WIKI_ROOT
+
+            wiki_root = os.fspath(WIKI_ROOT)
+            content_actions = [a for a in actions if a.type.upper() in ("WRITE", "EDIT")]
+
+            # No WRITE/EDIT actions: only the empty-wiki check applies, and
+            # that needs just the first visible file, not a full walk
+            if not content_actions:
+                if next(self._walk_visible_files(wiki_root), None) is None:
+                    suggest({
+                        'label': 'Wiki-Struktur vorschlagen',
+                        'description': 'Ich kann eine Grundstruktur mit häufigen Kategorien erstellen',
+                        'type':  'structure'
+                    })
+            else:
+                # One walk of the wiki serves every check below
+                wiki_files = [os.path.relpath(p, wiki_root) for p in self._walk_visible_files(wiki_root)]
+                category_entries: Dict[str, set] = {}  # category -> names in it, one listdir each
             
-            # After wiki creation - suggest related topics
-            if actions and any(a.type. upper() == "WRITE" for a in actions):
-                created_paths = [a.path for a in actions if a. type.upper() == "WRITE"]
+                # After wiki creation - suggest related topics
+                if actions and any(a.type. upper() == "WRITE" for a in actions):
+                    created_paths = [a.path for a in actions if a. type.upper() == "WRITE"]
                 
-                # Extract topics and categories
-                for path in created_paths:
-                    parts = path.split('/')
-                    if len(parts) > 1:
-                        category = parts[0]
-                        
-                        # Suggest related topics based on category
-                        related_topics = {
-                            'docker': ['kubernetes', 'docker-compose', 'containerization'],
-                            'kubernetes': ['helm', 'kubectl', 'k8s-networking'],
-                            'python': ['pip', 'virtualenv', 'pytest'],
-                            'linux': ['bash', 'systemd', 'networking'],
-                            'git': ['github', 'gitlab', 'git-workflow']
-                        }
+                    # Extract topics and categories
+                    for path in created_paths:
+                        if len(suggestions) >= max_suggestions:
+                            break
+                        parts = path.split('/')
+                        if len(parts) > 1:
+                            category = parts[0]
                         
-                        if category in related_topics:
-                            for topic in related_topics[category]:
-                                topic_path = f"{category}/{topic}"
-                                if not (WIKI_ROOT / topic_path).exists():
-                                    suggestions.append({
-                                        'label': f"Erstelle '{topic}' Wiki-Eintrag",
-                                        'description': f"Verwandtes Thema zu {category}",
-                                        'type': 'related_topic'
-                                    })
-                                    if len(suggestions) >= 2:
-                                        break
+                            # Suggest related topics based on category
+                            if category in _RELATED_TOPICS:
+                                entries = category_entries.get(category)
+                                if entries is None:
+                                    try:
+                                        entries = set(os.listdir(os.path.join(wiki_root, category)))
+                                    except OSError:
+                                        entries = set()
+                                    category_entries[category] = entries
+                                for topic in _RELATED_TOPICS[category]:
+                                    if topic not in entries:
+                                        suggest({
+                                            'label': f"Erstelle '{topic}' Wiki-Eintrag",
+                                            'description': f"Verwandtes Thema zu {category}",
+                                            'type': 'related_topic'
+                                        })
+                                        if len(suggestions) >= 2:
+                                            break
             
-            # Check if wiki is empty
-            wiki_structure = get_wiki_structure()
-            if wiki_structure['total_entries'] == 0:
-                suggestions.append({
-                    'label': 'Wiki-Struktur vorschlagen',
-                    'description': 'Ich kann eine Grundstruktur mit häufigen Kategorien erstellen',
-                    'type':  'structure'
-                })
+                # Check if wiki is empty
+                if not wiki_files:
+                    suggest({
+                        'label': 'Wiki-Struktur vorschlagen',
+                        'description': 'Ich kann eine Grundstruktur mit häufigen Kategorien erstellen',
+                        'type':  'structure'
+                    })
             
-            # Check for missing cross-references
-            if actions: 
-                for action in actions: 
-                    if action. content and action.type.upper() in ["WRITE", "EDIT"]: 
-                        # Find mentions of other topics
-                        content_lower = action.content. lower()
-                        potential_topics = ['docker', 'kubernetes', 'python', 'linux', 'git', 'aws', 'azure']
+                # Check for missing cross-references
+                if actions: 
+                    for action in actions: 
+                        if len(suggestions) >= max_suggestions:
+                            break
+                        if action. content and action.type.upper() in ["WRITE", "EDIT"]: 
+                            # Find mentions of other topics
+                            mentioned = {m.lower() for m in _CROSS_REFERENCE_RE.findall(action.content)}
                         
-                        for topic in potential_topics: 
-                            if topic in content_lower and topic not in action.path:
-                                topic_exists = (WIKI_ROOT / topic).exists() or any(
-                                    topic in str(p) for p in WIKI_ROOT.rglob('*') if p.is_file()
-                                )
-                                if not topic_exists: 
-                                    suggestions.append({
-                                        'label':  f"Erstelle '{topic}' Eintrag",
-                                        'description': f"Wird in {action.path} erwähnt",
-                                        'type':  'cross_reference'
-                                    })
-                                    break  # Only suggest one cross-reference
+                            for topic in _CROSS_REFERENCE_TOPICS: 
+                                if topic in mentioned and topic not in action.path:
+                                    topic_exists = (WIKI_ROOT / topic).exists() or any(
+                                        topic in f for f in wiki_files
+                                    )
+                                    if not topic_exists: 
+                                        suggest({
+                                            'label':  f"Erstelle '{topic}' Eintrag",
+                                            'description': f"Wird in {action.path} erwähnt",
+                                            'type':  'cross_reference'
+                                        })
+                                        break  # Only suggest one cross-reference
         
         except Exception: 
             pass  # Fail silently - suggestions are optional
@@ -982,7 +1523,7 @@ class RichSessionShell:
             table.add_column(style="white")
             table.add_column(style="dim")
             
-            for idx, suggestion in enumerate(suggestions[: 3], 1):  # Max 3 suggestions
+            for idx, suggestion in enumerate(itertools.islice(suggestions.values(), max_suggestions), 1):
                 table.add_row(
                     f"[{idx}]",
                     suggestion['label'],
@@ -1001,36 +1542,47 @@ class RichSessionShell:
         if not self.session:
             self.console.print("[yellow]No active session.  Starting new session.. .[/yellow]")
             self.session = start_session(write=True)
+        self._snapshot_session_info()
 
-        # Setup prompt_toolkit if available
+        # Show welcome
+        self.console.print(Group(
+            self._create_header_panel(),
+            _BLANK,
+            Text.from_markup("[dim]Type /help for commands, @file to mention files, / for slash commands[/dim]"),
+            _BLANK,
+        ))
+
+        # Setup prompt_toolkit if available (imported while the welcome is up)
         session_prompt = None
         if PROMPT_TOOLKIT_AVAILABLE:
+            from prompt_toolkit import PromptSession
+            from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
+            from prompt_toolkit.completion import ThreadedCompleter
+            from prompt_toolkit.formatted_text import HTML
+            from prompt_toolkit.history import FileHistory
+
             history_file = BASE_DIR / ".rich_session_history"
             
             session_prompt = PromptSession(
                 history=FileHistory(str(history_file)),
-                completer=ProfessionalCompleter(),
+                # Completions are computed off the UI thread, so typing never
+                # waits for them
+                completer=ThreadedCompleter(ProfessionalCompleter()),
                 complete_while_typing=True,
                 auto_suggest=AutoSuggestFromHistory(),
                 multiline=False,  # Single line input
             )
 
-        # Show welcome
-        self.console. print(self._create_header_panel())
-        self.console.print()
-        self.console.print("[dim]Type /help for commands, @file to mention files, / for slash commands[/dim]")
-        self.console.print()
-
         # Main loop
         while True: 
             try: 
-                # Show conversation if any
-                conv_panel = self._create_conversation_panel()
-                if conv_panel:
-                    self.console. print(conv_panel)
+                # Everything this turn changed is on disk before waiting
+                self._flush_session()
 
-                # Print top separator line (INPUT BOX TOP)
-                self._print_input_box_top()
+                # New turns (if any) and top separator line (INPUT BOX TOP)
+                # go out in one render
+                self._print_input_box_top(self._create_conversation_panel())
+                self._shown_turns = len(self.conversation_history)
                 
                 # Get input with placeholder
                 if session_prompt:
@@ -1046,7 +1598,6 @@ class RichSessionShell:
                 
                 # Print bottom separator and footer (INPUT BOX BOTTOM)
                 self._print_input_box_bottom_and_footer()
-                self.console.print()
 
                 if not user_input: 
                     continue
@@ -1058,9 +1609,14 @@ class RichSessionShell:
 
                 if user_input in ("/clear", "/cls"):
                     self. conversation_history = []
+                    self._turn_renderables.clear()
+                    self._prerendered_count = 0
+                    self._history_lower = []
+                    self._shown_turns = 0
+                    _invalidate_git_files()
                     self.console.clear()
-                    self. console.print(self._create_header_panel())
-                    self.console.print()
+                    self._invalidate_frame_cache()
+                    self.console.print(Group(self._create_header_panel(), _BLANK))
                     continue
 
                 if user_input in ("/help", "help"):
@@ -1068,6 +1624,7 @@ class RichSessionShell:
                     continue
 
                 if user_input == "/model":
+                    self._snapshot_session_info()
                     self.show_model_info()
                     continue
                 
@@ -1119,8 +1676,9 @@ class RichSessionShell:
                     if hasattr(self, 'last_user_input') and self.last_user_input: 
                         self.console.print("[cyan]🔄 Retrying last request.. .[/cyan]")
                         # Restore previous file state
-                        if hasattr(self, 'last_files'):
-                            self.attached_files = self. last_files. copy()
+                        if hasattr(self, 'last_files_count'):
+                            for filepath in list(self.attached_files)[self.last_files_count:]:
+                                del self.attached_files[filepath]
                         self.process_ai_request(self.last_user_input, is_retry=True)
                     else: 
                         self. console.print("[dim]No previous request to retry[/dim]")
@@ -1134,7 +1692,7 @@ class RichSessionShell:
                 if user_input == "reject": 
                     if self. session.get("pending_actions"):
                         self.session["pending_actions"] = []
-                        save_session(self.session)
+                        self._mark_session_dirty()
                         self.console. print("[yellow]✓[/yellow] Pending actions rejected")
                     else:
                         self.console.print("[dim]No pending actions to reject[/dim]")
@@ -1149,6 +1707,9 @@ class RichSessionShell:
             except Exception as e:
                 self. console.print(f"[red]Error:[/red] {str(e)}")
 
+        self._flush_session()
+        self._flush_memory()
+
     def attach_file(self, filepath: str):
         """Manually attach a file to context"""
         content = self._read_file(filepath)
@@ -1169,11 +1730,7 @@ class RichSessionShell:
         table.add_column("Size", style="dim", justify="right")
         
         for filepath, content in self.attached_files.items():
-            size = len(content)
-            size_str = f"{size:,} bytes"
-            if size > 1024:
-                size_str = f"{size/1024:.1f} KB"
-            table.add_row(filepath, size_str)
+            table.add_row(filepath, _format_size(len(content)))
         
         panel = Panel(
             table,
@@ -1181,8 +1738,7 @@ class RichSessionShell:
             border_style="cyan",
             box=box.ROUNDED
         )
-        self.console.print(panel)
-        self.console.print()
+        self.console.print(Group(panel, _BLANK))
 
     def search_conversation(self, query: str):
         """Search through conversation history"""
@@ -1190,13 +1746,26 @@ class RichSessionShell:
             self.console.print("[dim]No conversation history to search[/dim]")
             return
         
+        # Match against contents lowercased once (turns never change once
+        # added); the pattern only highlights the few results shown
+        history = self.conversation_history
+        lowered = self._history_lower
+        if len(lowered) > len(history):
+            lowered.clear()  # history was replaced
+        lowered.extend(turn.get("content", "").lower() for turn in history[len(lowered):])
+        query_lower = query.lower()
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        max_results = 10
+
         results = []
-        for i, turn in enumerate(self. conversation_history):
-            role = turn.get("role", "user")
-            content = turn.get("content", "")
-            
-            if query.lower() in content.lower():
-                results.append((i, role, content))
+        more = False
+        for i, (turn, content_lower) in enumerate(zip(history, lowered)):
+            if query_lower in content_lower:
+                content = turn.get("content", "")
+                if len(results) == max_results:
+                    more = True
+                    break
+                results.append((i, turn.get("role", "user"), content))
         
         if not results:
             self.console.print(f"[dim]No results found for:  {query}[/dim]")
@@ -1208,21 +1777,22 @@ class RichSessionShell:
         table.add_column("Role", style="cyan", width=10)
         table.add_column("Content", style="white")
         
-        for idx, role, content in results[: 10]:  # Show max 10 results
+        for idx, role, content in results:
             # Truncate content
             preview = content[: 100] + "..." if len(content) > 100 else content
             # Highlight query in preview (case-insensitive)
-            preview = re.sub(f'({re.escape(query)})', r'[yellow]\1[/yellow]', preview, flags=re. IGNORECASE)
+            preview = pattern.sub(r'[yellow]\g<0>[/yellow]', preview)
             
             role_styled = "[cyan]User[/cyan]" if role == "user" else "[magenta]Assistant[/magenta]"
             table.add_row(str(idx), role_styled, preview)
         
+        found = f"first {max_results}" if more else str(len(results))
         panel = Panel(
             table,
             title=f"[bold]Search Results for '{query}'[/bold]",
             border_style="cyan",
             box=box.ROUNDED,
-            subtitle=f"[dim]Found {len(results)} result(s)[/dim]"
+            subtitle=f"[dim]Found {found} result(s)[/dim]"
         )
         self.console.print(panel)
         self.console.print()
@@ -1,30 +1,53 @@
 # tools/memory/context.py
 """Session-overarching contextual memory for the LinkoWiki assistant"""
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, FrozenSet, Optional, Tuple
+import atexit
+import itertools
 import json
+import os
+import time
+from collections import deque
 from datetime import datetime
 from difflib import SequenceMatcher
 
+# Optional: orjson encodes several times faster than the json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 BASE_DIR = Path(__file__).resolve().parents[2]
 MEMORY_FILE = BASE_DIR / ".linkowiki-memory.json"
+SAVE_INTERVAL = 2.0  # seconds; remember_action writes at most this often
+MAX_RECENT_ACTIONS = 50  # older actions drop out of memory
 
 
 class ContextMemory:
     """Manages contextual memory across sessions"""
     
     def __init__(self):
-        self.recent_actions: List[Dict[str, Any]] = []
+        # Bounded, so appending past the limit evicts the oldest in O(1)
+        self.recent_actions: "deque[Dict[str, Any]]" = deque(maxlen=MAX_RECENT_ACTIONS)
+        # prompt -> (lowercased, word set); kept off the entries so the
+        # memory file only holds what it always did
+        self._prompt_tokens: Dict[str, Tuple[str, FrozenSet[str]]] = {}
         self.user_preferences: Dict[str, Any] = {}
         self.common_patterns: Dict[str, int] = {}
+        self._dirty = False  # changes not written yet (see _save_throttled)
+        self._last_save = 0.0
         self._load()
+        atexit.register(self.flush)
     
     def _load(self):
         """Load memory from disk"""
         if MEMORY_FILE.exists():
             try:
-                data = json.loads(MEMORY_FILE.read_text(encoding='utf-8'))
-                self.recent_actions = data.get('recent_actions', [])[-50:]  # Keep last 50
+                # Both parse the UTF-8 bytes directly (no separate decode step)
+                raw = MEMORY_FILE.read_bytes()
+                data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+                self.recent_actions = deque(data.get('recent_actions', []), maxlen=MAX_RECENT_ACTIONS)
                 self.user_preferences = data.get('user_preferences', {})
                 self.common_patterns = data.get('common_patterns', {})
             except (json.JSONDecodeError, UnicodeDecodeError, IOError) as e:
@@ -32,17 +55,36 @@ class ContextMemory:
                 pass
     
     def _save(self):
-        """Save memory to disk"""
+        """Save memory to disk (atomically: written to a temp file, then renamed)"""
         try:
             data = {
-                'recent_actions': self.recent_actions[-50:],  # Keep last 50
+                'recent_actions': list(self.recent_actions),
                 'user_preferences': self.user_preferences,
                 'common_patterns': self.common_patterns,
                 'last_updated': datetime.now().isoformat()
             }
-            MEMORY_FILE.write_text(json.dumps(data, indent=2), encoding='utf-8')
-        except (json.JSONEncodeError, PermissionError, IOError) as e:
+            if ORJSON_AVAILABLE:
+                payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(data, indent=2).encode('utf-8')
+            tmp_file = MEMORY_FILE.with_name(MEMORY_FILE.name + '.tmp')
+            tmp_file.write_bytes(payload)
+            os.replace(tmp_file, MEMORY_FILE)
+            self._dirty = False
+            self._last_save = time.monotonic()
+        except (TypeError, ValueError, OSError):
             pass  # Fail silently to not interrupt user workflow
+
+    def _save_throttled(self):
+        """Save now, or leave the changes for a later save / flush()"""
+        self._dirty = True
+        if time.monotonic() - self._last_save >= SAVE_INTERVAL:
+            self._save()
+
+    def flush(self):
+        """Write changes held back by the save throttle (also runs at exit)"""
+        if self._dirty:
+            self._save()
     
     def remember_action(self, action: Dict[str, Any], prompt: str):
         """
@@ -59,13 +101,27 @@ class ContextMemory:
         }
         
         self.recent_actions.append(memory_entry)
+        self._tokenize(prompt)
         
         # Track common patterns
         pattern_key = f"{action.get('type', '')}:{action.get('path', '').split('/')[0]}"
         self.common_patterns[pattern_key] = self.common_patterns.get(pattern_key, 0) + 1
         
-        self._save()
+        self._save_throttled()
     
+    def _tokenize(self, prompt: str) -> Tuple[str, FrozenSet[str]]:
+        """Lowercased prompt and its word set, computed once per prompt"""
+        tokens = self._prompt_tokens.get(prompt)
+        if tokens is None:
+            if len(self._prompt_tokens) >= 2 * MAX_RECENT_ACTIONS:
+                # Forget prompts whose actions have dropped out of memory
+                live = {entry['prompt'] for entry in self.recent_actions}
+                self._prompt_tokens = {p: t for p, t in self._prompt_tokens.items() if p in live}
+            lowered = prompt.lower()
+            tokens = (lowered, frozenset(lowered.split()))
+            self._prompt_tokens[prompt] = tokens
+        return tokens
+
     def suggest_similar(self, prompt: str) -> List[Dict[str, Any]]:
         """
         Suggest similar actions based on prompt history.
@@ -81,18 +137,25 @@ class ContextMemory:
         
         suggestions = []
         prompt_lower = prompt.lower()
+        prompt_words = set(prompt_lower.split())
+        matcher = SequenceMatcher(None, prompt_lower)
         
-        for entry in self.recent_actions[-20:]:  # Check last 20 actions
-            past_prompt = entry['prompt'].lower()
-            
-            # Calculate similarity
-            similarity = SequenceMatcher(None, prompt_lower, past_prompt).ratio()
+        recent = self.recent_actions
+        for entry in itertools.islice(recent, max(len(recent) - 20, 0), None):  # Check last 20 actions
+            past_prompt, past_words = self._tokenize(entry['prompt'])
             
-            # Also check for keyword overlap
-            prompt_words = set(prompt_lower.split())
-            past_words = set(past_prompt.split())
+            # Keyword overlap is cheap, so it comes first
             word_overlap = len(prompt_words & past_words) / max(len(prompt_words), 1)
             
+            # Calculate similarity. quick ratios are upper bounds of ratio();
+            # skip the full alignment when even they can't reach the threshold
+            matcher.set_seq2(past_prompt)
+            if (matcher.real_quick_ratio() * 0.6) + (word_overlap * 0.4) <= 0.3:
+                continue
+            if (matcher.quick_ratio() * 0.6) + (word_overlap * 0.4) <= 0.3:
+                continue
+            similarity = matcher.ratio()
+            
             combined_score = (similarity * 0.6) + (word_overlap * 0.4)
             
             if combined_score > 0.3:  # Threshold for relevance
@@ -180,8 +243,10 @@ class ContextMemory:
     
     def clear(self):
         """Clear all memory (for testing or reset)"""
-        self.recent_actions = []
+        self.recent_actions.clear()
+        self._prompt_tokens = {}
         self.user_preferences = {}
         self.common_patterns = {}
+        self._dirty = False
         if MEMORY_FILE.exists():
             MEMORY_FILE.unlink()
@@ -3,12 +3,17 @@
 LinkoWiki Professional Session Shell
 Rich-based TUI with auto-resize, live-updates, and professional styling
 """
+import bisect
+import itertools
+import operator
 import os
 import sys
 import signal
 import subprocess
+import time
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from collections import deque
+from typing import Deque, List, Optional, Dict, Any
 from datetime import datetime
 
 # Add project root to path
@@ -42,7 +47,23 @@ except ImportError:
 
 # Project imports
 from tools.session.manager import load_session, start_session, add_history, save_session
-from tools.ai.assistant import run_ai, Action
+from tools.ai.assistant import run_ai, run_ai_stream, Action
+
+
+_action_fields = operator.attrgetter("type", "path", "content")
+# Flattens an action's content into its one-line table preview in one pass
+_PREVIEW_FLATTEN = str.maketrans("\n\r\t", "   ")
+
+
+def _content_preview(content: Optional[str]) -> str:
+    if not content:
+        return ""
+    preview = content[:50].translate(_PREVIEW_FLATTEN)
+    return preview + "..." if len(content) > 50 else preview
+
+
+# Spacer between conversation turns (renderables are immutable when printed)
+_BLANK = Text("")
 
 
 class ProfessionalCompleter(Completer):
@@ -60,28 +81,50 @@ class ProfessionalCompleter(Completer):
         ("reject", "❌ Reject pending actions"),
     ]
 
+    # File-type emoji by extension, looked up once per cache refresh
+    FILE_EMOJI = {
+        '.py': '🐍',
+        '.js': '💛', '.ts': '💛', '.jsx': '💛', '.tsx': '💛',
+        '.md': '📝', '.txt': '📝',
+        '.json': '⚙️', '.yaml': '⚙️', '.yml': '⚙️',
+    }
+
     def __init__(self):
         self.files_cache: List[str] = []
+        self.files_emoji: List[str] = []
         self._update_files_cache()
 
+        # Commands bucketed by their first one and two characters, so a
+        # keystroke only tests the commands that can still match
+        self._cmd_buckets: Dict[str, List[tuple]] = {}
+        for cmd, desc in self.COMMANDS:
+            for key in {cmd[:1], cmd[:2]}:
+                self._cmd_buckets.setdefault(key, []).append((cmd, desc))
+
     def _update_files_cache(self):
         """Update git-tracked files cache"""
         try:
+            # -z: NUL-separated, unquoted paths; decode the buffer once
             result = subprocess.run(
-                ["git", "ls-files"],
+                ["git", "ls-files", "-z"],
                 capture_output=True,
-                text=True,
                 cwd=BASE_DIR,
                 timeout=2
             )
             if result.returncode == 0:
-                self.files_cache = [
-                    f for f in result.stdout.strip().split('\n')
+                # Sorted so get_completions can bisect to the prefix range
+                self.files_cache = sorted(
+                    f for f in result.stdout.decode("utf-8", "replace").split('\0')
                     if f and not f.startswith('.')
-                ]
+                )
         except:
             self.files_cache = []
 
+        emoji = self.FILE_EMOJI
+        self.files_emoji = [
+            emoji.get(os.path.splitext(f)[1], '📄') for f in self.files_cache
+        ]
+
     def get_completions(self, document, complete_event):
         text = document.text_before_cursor
 
@@ -90,31 +133,23 @@ class ProfessionalCompleter(Completer):
             at_pos = text.rfind('@')
             file_prefix = text[at_pos + 1:]
 
-            for file_path in self.files_cache:
-                if file_path.startswith(file_prefix):
-                    # Determine file type emoji
-                    if file_path.endswith('.py'):
-                        emoji = '🐍'
-                    elif file_path.endswith(('.js', '.ts', '.jsx', '.tsx')):
-                        emoji = '💛'
-                    elif file_path.endswith(('.md', '.txt')):
-                        emoji = '📝'
-                    elif file_path.endswith(('.json', '.yaml', '.yml')):
-                        emoji = '⚙️'
-                    else:
-                        emoji = '📄'
-
-                    yield Completion(
-                        file_path,
-                        start_position=-len(file_prefix),
-                        display=file_path,
-                        display_meta=f"{emoji} File"
-                    )
+            cache = self.files_cache
+            i = bisect.bisect_left(cache, file_prefix)
+            while i < len(cache) and cache[i].startswith(file_prefix):
+                file_path = cache[i]
+                yield Completion(
+                    file_path,
+                    start_position=-len(file_prefix),
+                    display=file_path,
+                    display_meta=f"{self.files_emoji[i]} File"
+                )
+                i += 1
 
         # Slash commands
         elif text.startswith('/') or not text:
-            for cmd, desc in self.COMMANDS:
-                if cmd.startswith(text if text else '/'):
+            prefix = text if text else '/'
+            for cmd, desc in self._cmd_buckets.get(prefix[:2], ()):
+                if cmd.startswith(prefix):
                     yield Completion(
                         cmd,
                         start_position=-len(text) if text else 0,
@@ -129,9 +164,17 @@ class RichSessionShell:
     def __init__(self):
         self.console = Console()
         self.session = None
-        self.conversation_history: List[Dict[str, Any]] = []
+        # Bounded so long sessions don't grow without limit
+        self.conversation_history: Deque[Dict[str, Any]] = deque(maxlen=200)
         self.is_processing = False
         self.current_task = None
+        self._git_cache = (0.0, None)  # (monotonic timestamp, info)
+        self._footer_panel = None  # static, built on first use
+        self._home = os.path.expanduser("~")
+        self._header_cache_key = None
+        self._header_cache_panel = None
+        self._turn_count = 0  # turns ever appended (deque length saturates)
+        self._rendered_turns = 0  # of those, turns already on screen
 
         # Terminal info
         self.update_terminal_size()
@@ -150,35 +193,50 @@ class RichSessionShell:
         self.term_height = size.height
 
     def _get_git_info(self) -> Dict[str, str]:
-        """Get git branch and status"""
+        """Get git branch and status (one git call, cached for a second)"""
+        ts, info = self._git_cache
+        now = time.monotonic()
+        if info is not None and now - ts < 1.0:
+            return info
+
         try:
-            # Get branch
             result = subprocess.run(
-                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+                ["git", "status", "--porcelain=v2", "--branch", "-z"],
                 capture_output=True,
-                text=True,
-                cwd=BASE_DIR
+                cwd=BASE_DIR,
+                timeout=2
             )
-            branch = result.stdout.strip() if result.returncode == 0 else ""
-
-            # Check if dirty
-            if branch:
-                status = subprocess.run(
-                    ["git", "status", "--porcelain"],
-                    capture_output=True,
-                    text=True,
-                    cwd=BASE_DIR
-                )
-                is_dirty = bool(status.stdout.strip())
-                branch = f"{branch}*" if is_dirty else branch
-
-            return {"branch": branch}
+            branch = ""
+            is_dirty = False
+            if result.returncode == 0:
+                for record in result.stdout.decode("utf-8", "replace").split("\0"):
+                    if record.startswith("# branch.head "):
+                        branch = record[len("# branch.head "):]
+                        if branch == "(detached)":
+                            branch = "HEAD"
+                    elif record and not record.startswith("#"):
+                        is_dirty = True
+
+            if branch and is_dirty:
+                branch = f"{branch}*"
+            info = {"branch": branch}
         except:
-            return {"branch": ""}
+            info = {"branch": ""}
+
+        self._git_cache = (now, info)
+        return info
 
     def _create_header_panel(self) -> Panel:
         """Create professional header panel"""
         git_info = self._get_git_info()
+        cwd = os.getcwd()
+
+        # Rebuild only when something shown in the header changed
+        session = self.session or {}
+        key = (cwd, session.get("write"), session.get("active_provider_id"),
+               bool(self.session), git_info["branch"])
+        if key == self._header_cache_key:
+            return self._header_cache_panel
 
         # Get session info
         provider_id = "unknown"
@@ -196,8 +254,7 @@ class RichSessionShell:
         table.add_column(style="dim", justify="right")
 
         # Path and git
-        cwd = os.getcwd()
-        home = os.path.expanduser("~")
+        home = self._home
         short_cwd = "~" + cwd[len(home):] if cwd.startswith(home) else cwd
 
         left = f"[bold]LinkoWiki Code[/bold] [dim]Session[/dim]"
@@ -214,16 +271,21 @@ class RichSessionShell:
             f"[dim]Mode:[/dim] {mode}"
         )
 
-        return Panel(
+        self._header_cache_key = key
+        self._header_cache_panel = Panel(
             table,
             border_style="cyan",
             box=box.ROUNDED,
             title="[bold]🧠 LinkoWiki[/bold]",
             title_align="left"
         )
+        return self._header_cache_panel
 
     def _create_status_footer(self) -> Panel:
         """Create status footer panel"""
+        if self._footer_panel is not None:
+            return self._footer_panel
+
         # Calculate context usage (placeholder for now)
         context_usage = 0.13
         requests_remaining = 98.2
@@ -245,42 +307,28 @@ class RichSessionShell:
 
         table.add_row(left, middle, right)
 
-        return Panel(
+        self._footer_panel = Panel(
             table,
             border_style="dim",
             box=box.SIMPLE,
             padding=(0, 1)
         )
+        return self._footer_panel
 
     def _create_conversation_panel(self) -> Optional[Panel]:
-        """Create conversation history panel"""
-        if not self.conversation_history:
+        """Create panel for conversation turns not yet shown on screen"""
+        pending = min(self._turn_count - self._rendered_turns, 5)  # Last 5 turns
+        if pending <= 0:
             return None
+        self._rendered_turns = self._turn_count
 
-        # Create conversation display
+        # Create conversation display from the renderables built on append,
+        # each followed by the shared spacer
         conversation_parts = []
-
-        for turn in self.conversation_history[-5:]:  # Last 5 turns
-            role = turn.get("role", "user")
-            content = turn.get("content", "")
-
-            if role == "user":
-                text = Text()
-                text.append("→ ", style="bold cyan")
-                text.append(content, style="white")
-                conversation_parts.append(text)
-            else:  # assistant
-                # Render as markdown if it looks like markdown
-                if "```" in content or "#" in content:
-                    conversation_parts.append(Markdown(content))
-                else:
-                    text = Text()
-                    text.append("← ", style="bold magenta")
-                    text.append(content, style="white")
-                    conversation_parts.append(text)
-
-            # Add spacing
-            conversation_parts.append(Text(""))
+        turns = list(itertools.islice(reversed(self.conversation_history), pending))
+        for turn in reversed(turns):
+            conversation_parts.append(turn["renderable"])
+            conversation_parts.append(_BLANK)
 
         group = Group(*conversation_parts)
 
@@ -362,81 +410,135 @@ class RichSessionShell:
         self.console.print(panel)
         self.console.print()
 
-    def process_ai_request(self, user_input: str):
-        """Process AI request with live updates"""
-        self.is_processing = True
-
-        # Add user message to history
-        self.conversation_history.append({
-            "role": "user",
-            "content": user_input
-        })
+    def _append_turn(self, role: str, content: str) -> Dict[str, Any]:
+        """Append a conversation turn, classifying and rendering it once"""
+        is_markdown = "```" in content or "#" in content
+        if role == "user":
+            renderable = Text()
+            renderable.append("→ ", style="bold cyan")
+            renderable.append(content, style="white")
+        elif is_markdown:
+            # Render as markdown if it looks like markdown
+            renderable = Markdown(content)
+        else:
+            renderable = Text()
+            renderable.append("← ", style="bold magenta")
+            renderable.append(content, style="white")
+
+        turn = {
+            "role": role,
+            "content": content,
+            "is_markdown": is_markdown,
+            "renderable": renderable,
+        }
+        self.conversation_history.append(turn)
+        self._turn_count += 1
+        return turn
+
+    def _assistant_renderable(self, message: str):
+        """Renderable for an assistant message (markdown panel or plain line)"""
+        if "```" in message or "#" in message:
+            return Panel(
+                Markdown(message),
+                border_style="magenta",
+                box=box.ROUNDED,
+                title="[bold]Assistant[/bold]",
+                title_align="left"
+            )
+        return Text.from_markup("[bold magenta]←[/bold magenta] ") + Text(message)
 
-        # Show processing indicator
+    def _run_ai_spinner(self, user_input: str):
+        """Call run_ai behind a spinner (non-streaming fallback)"""
         with Progress(
             SpinnerColumn(),
             TextColumn("[bold magenta]{task.description}"),
             console=self.console,
             transient=True
         ) as progress:
-            task = progress.add_task("Processing your request...", total=None)
+            progress.add_task("Processing your request...", total=None)
+            return run_ai(user_input, self.session.get("files", {}), session=self.session)
 
-            try:
-                # Add to session history
-                add_history(user_input)
+    def _run_ai_live(self, user_input: str):
+        """Stream the assistant message into a Live region; return the final result.
+
+        Falls back to the spinner + run_ai when the provider fails before
+        producing any output (e.g. streaming not supported).
+        """
+        result = None
+        received = False
+        try:
+            with Live(
+                Text("…", style="dim"),
+                console=self.console,
+                refresh_per_second=8,
+                transient=True  # long answers overflow the live region
+            ) as live:
+                for item in run_ai_stream(user_input, self.session.get("files", {}), session=self.session):
+                    received = True
+                    if isinstance(item, str):
+                        live.update(self._assistant_renderable(item))
+                    else:
+                        result = item
+        except Exception:
+            if received:
+                raise
+        if result is None:
+            result = self._run_ai_spinner(user_input)
+        # Final, complete rendering replaces the transient live view
+        self.console.print(self._assistant_renderable(result.message))
+        return result
 
-                # Call AI
-                result = run_ai(user_input, self.session.get("files", {}), session=self.session)
+    def process_ai_request(self, user_input: str):
+        """Process AI request with live updates"""
+        self.is_processing = True
 
-                # Add assistant response to history
-                self.conversation_history.append({
-                    "role": "assistant",
-                    "content": result.message
-                })
+        # Add user message to history
+        self._append_turn("user", user_input)
 
-                # Display response
-                self.console.print()
-                if "```" in result.message or "#" in result.message:
-                    # Render as markdown
-                    self.console.print(Panel(
-                        Markdown(result.message),
-                        border_style="magenta",
-                        box=box.ROUNDED,
-                        title="[bold]Assistant[/bold]",
-                        title_align="left"
-                    ))
-                else:
-                    self.console.print(f"[bold magenta]←[/bold magenta] {result.message}")
+        try:
+            # Add to session history
+            add_history(user_input)
 
-                self.console.print()
+            # Call AI - the response is displayed while it streams in
+            self.console.print()
+            result = self._run_ai_live(user_input)
+            self.console.print()
 
-                # Show actions if any
-                if result.actions:
-                    self._display_actions(result.actions)
-                    self.session["pending_actions"] = [a.dict() for a in result.actions]
-                    save_session(self.session)
+            # Add assistant response to history
+            self._append_turn("assistant", result.message)
 
-            except Exception as e:
-                self.console.print(f"[red]Error:[/red] {str(e)}")
-                import traceback
-                self.console.print(f"[dim]{traceback.format_exc()}[/dim]")
+            # Show actions if any
+            if result.actions:
+                self._display_actions(result.actions)
+                self.session["pending_actions"] = [a.dict() for a in result.actions]
+                save_session(self.session)
+
+        except Exception as e:
+            self.console.print(f"[red]Error:[/red] {str(e)}")
+            import traceback
+            self.console.print(f"[dim]{traceback.format_exc()}[/dim]")
 
-            finally:
-                self.is_processing = False
+        finally:
+            self.is_processing = False
+            # The exchange was printed above; don't repeat it in the panel
+            self._rendered_turns = self._turn_count
 
     def _display_actions(self, actions: List[Action]):
         """Display pending actions beautifully"""
         table = Table(show_header=True, box=box.SIMPLE_HEAD)
         table.add_column("Type", style="yellow")
         table.add_column("Path", style="cyan")
-        table.add_column("Description", style="dim")
-
-        for action in actions:
-            table.add_row(
-                action.type.upper(),
-                str(action.path),
-                action.description or ""
-            )
+        table.add_column("Preview", style="dim")
+
+        # Extract all cell values in one pass; the preview is the first 50
+        # characters of the content, as in linkowiki-cli's action table
+        rows = [
+            (a_type.upper(), a_path if isinstance(a_path, str) else str(a_path),
+             _content_preview(a_content))
+            for a_type, a_path, a_content in map(_action_fields, actions)
+        ]
+        for row in rows:
+            table.add_row(*row)
 
         panel = Panel(
             table,
@@ -466,6 +568,11 @@ class RichSessionShell:
                 completer=ProfessionalCompleter(),
                 complete_while_typing=True,
                 auto_suggest=AutoSuggestFromHistory(),
+                # Status lives in the toolbar, redrawn by prompt_toolkit
+                # in place instead of printing a footer before every prompt
+                bottom_toolbar=HTML(
+                    "<b>Ctrl+C</b> Exit · <b>Ctrl+R</b> History · <b>/help</b> Commands"
+                ),
             )
 
         # Show welcome
@@ -482,8 +589,9 @@ class RichSessionShell:
                 if conv_panel:
                     self.console.print(conv_panel)
 
-                # Show footer
-                self.console.print(self._create_status_footer())
+                # Show footer (prompt_toolkit shows it as bottom toolbar)
+                if not session_prompt:
+                    self.console.print(self._create_status_footer())
 
                 # Get input
                 self.console.print()
@@ -505,7 +613,8 @@ class RichSessionShell:
                     break
 
                 if user_input in ("/clear", "/cls"):
-                    self.conversation_history = []
+                    self.conversation_history.clear()
+                    self._turn_count = self._rendered_turns = 0
                     self.console.clear()
                     self.console.print(self._create_header_panel())
                     self.console.print()
@@ -0,0 +1,33 @@
+# tools/session/_json.py
+"""JSON encode/decode for the session file, using orjson when installed
+
+dumps(obj) -> bytes: indented UTF-8 JSON with a trailing newline
+dumps_line(obj) -> bytes: compact JSON on a single line, newline-terminated
+loads(data) -> object: parses bytes (or str)
+"""
+import json
+from functools import partial
+
+# Optional: orjson encodes several times faster than the json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Backend is picked once at import, not re-checked on every call
+if ORJSON_AVAILABLE:
+    dumps = partial(orjson.dumps, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    dumps_line = partial(orjson.dumps, option=orjson.OPT_APPEND_NEWLINE)
+    loads = orjson.loads
+else:
+    _encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+    _line_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(obj) -> bytes:
+        return (_encoder.encode(obj) + "\n").encode("utf-8")
+
+    def dumps_line(obj) -> bytes:
+        return (_line_encoder.encode(obj) + "\n").encode("utf-8")
+
+    loads = json.loads
@@ -1,5 +1,6 @@
 # tools/session/export.py
 """Session export and history management"""
+import io
 import json
 from pathlib import Path
 from datetime import datetime
@@ -18,38 +19,43 @@ def export_session_history(session: dict, output_dir: Path = None):
     filename = f"session_{timestamp}.md"
     output_file = output_dir / filename
     
-    content = []
-    content.append(f"# LinkoWiki Session Export\n")
-    content.append(f"**Session ID:** {session['id']}")
-    content.append(f"**Started by:** {session['started_by']}")
-    content.append(f"**Mode:** {'Write' if session['write'] else 'Read-only'}")
-    content.append(f"**Exported:** {timestamp}\n")
+    # One buffer as the single sink; every line ends with a newline
+    buf = io.StringIO()
+    w = buf.write
+    w("# LinkoWiki Session Export\n\n")
+    w(f"**Session ID:** {session['id']}\n")
+    w(f"**Started by:** {session['started_by']}\n")
+    w(f"**Mode:** {'Write' if session['write'] else 'Read-only'}\n")
+    w(f"**Exported:** {timestamp}\n\n")
     
     if session.get('history'):
-        content.append("## 📝 Conversation History\n")
+        w("## 📝 Conversation History\n\n")
         for i, entry in enumerate(session['history'], 1):
-            content.append(f"### Query {i}")
-            content.append(f"```\n{entry}\n```\n")
+            w("### Query ")
+            w(str(i))
+            w("\n```\n")
+            w(entry)
+            w("\n```\n\n")
     
     if session.get('files'):
-        content.append("## 📎 Attached Files\n")
+        w("## 📎 Attached Files\n\n")
         for filepath in session['files'].keys():
-            content.append(f"- `{filepath}`")
-        content.append("")
+            w(f"- `{filepath}`\n")
+        w("\n")
     
     if session.get('changes'):
-        content.append("## ✏️  Changes Made\n")
+        w("## ✏️  Changes Made\n\n")
         for change in session['changes']:
-            content.append(f"- {change}")
-        content.append("")
+            w(f"- {change}\n")
+        w("\n")
     
     if session.get('pending_actions'):
-        content.append("## ⏳ Pending Actions\n")
+        w("## ⏳ Pending Actions\n\n")
         for action in session['pending_actions']:
-            content.append(f"- **{action['type'].upper()}** `{action['path']}`")
-        content.append("")
+            w(f"- **{action['type'].upper()}** `{action['path']}`\n")
+        w("\n")
     
-    output_file.write_text('\n'.join(content))
+    output_file.write_text(buf.getvalue(), encoding='utf-8')
     return output_file
 
 
@@ -1,21 +1,193 @@
 # tools/session/manager.py
-import json
 import getpass
+import hashlib
+import os
+import shutil
+from collections.abc import MutableMapping
 from pathlib import Path
 from datetime import datetime
 
+from tools.session._json import dumps, dumps_line, loads
+
 BASE_DIR = Path(__file__).resolve().parents[2]
 SESSION_FILE = BASE_DIR / ".linkowiki-session.json"
+# Append-only logs: add_history/record_change write one JSON line here instead
+# of rewriting SESSION_FILE. save_session folds them back into the snapshot.
+HISTORY_FILE = BASE_DIR / ".linkowiki-session.history.log"
+CHANGES_FILE = BASE_DIR / ".linkowiki-session.changes.log"
+_SESSION_LOGS = (("history", HISTORY_FILE), ("changes", CHANGES_FILE))
+# Attached file bodies, one file per content hash; the session JSON only
+# keeps {path: hash} under "file_refs" so saves don't re-encode them
+FILES_DIR = BASE_DIR / ".linkowiki-session.files"
+
+# Last session parsed by load_session, see there
+_cached_session = None
+_cached_key = None
+_cached_offsets = {}
+
+
+def _append_log(log: Path, entry: str):
+    with open(log, "ab") as f:
+        f.write(dumps_line(entry))
+
+
+def _read_log(log: Path, offset: int = 0):
+    """Return (entries, end) for complete lines from offset on
+
+    end is just past the last newline, so a torn line from an interrupted
+    append is left for the next read instead of being consumed.
+    """
+    try:
+        with open(log, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], 0
+    complete = data.rfind(b"\n") + 1
+    entries = []
+    for line in data[:complete].splitlines():
+        try:
+            entries.append(loads(line))
+        except ValueError:
+            pass  # unparseable line, skip it
+    return entries, offset + complete
+
+
+def _store_file(body: str) -> str:
+    """Write body to FILES_DIR (once per content) and return its hash"""
+    data = body.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    target = FILES_DIR / digest
+    if not target.exists():
+        FILES_DIR.mkdir(exist_ok=True)
+        target.write_bytes(data)
+    return digest
+
+
+class AttachedFiles(MutableMapping):
+    """session["files"]: {path: contents}, reading each body on first access"""
+
+    def __init__(self, refs: dict):
+        self.refs = dict(refs)  # path -> content hash
+        self._bodies = {}
+
+    def __getitem__(self, path):
+        body = self._bodies.get(path)
+        if body is None:
+            digest = self.refs[path]
+            try:
+                body = (FILES_DIR / digest).read_bytes().decode("utf-8")
+            except FileNotFoundError:
+                body = ""  # store removed behind our back; attachments are only context
+            self._bodies[path] = body
+        return body
+
+    def __setitem__(self, path, body):
+        self.refs[path] = _store_file(body)
+        self._bodies[path] = body
+
+    def __delitem__(self, path):
+        del self.refs[path]
+        self._bodies.pop(path, None)
+
+    def __iter__(self):
+        return iter(self.refs)
+
+    def __len__(self):
+        return len(self.refs)
+
+
+def _file_refs(files) -> dict:
+    if isinstance(files, AttachedFiles):
+        return files.refs
+    return {path: _store_file(body) for path, body in files.items()}
+
+
+def _clear_logs():
+    for _, log in _SESSION_LOGS:
+        try:
+            log.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
 
 
 def load_session():
-    if not SESSION_FILE.exists():
+    """Return the session dict, or None when no session is running
+
+    The parsed session is cached and returned again while SESSION_FILE is
+    unchanged (same path, mtime and size); new log lines are read from where
+    the last call stopped. Callers share the returned dict.
+    """
+    global _cached_session, _cached_key, _cached_offsets
+    try:
+        st = SESSION_FILE.stat()
+    except FileNotFoundError:
+        _cached_session = None
         return None
-    return json.loads(SESSION_FILE.read_text())
+    key = (SESSION_FILE, st.st_mtime_ns, st.st_size)
+
+    if _cached_session is not None and key == _cached_key:
+        s = _cached_session
+        for key_name, log in _SESSION_LOGS:
+            offset = _cached_offsets.get(log, 0)
+            size = _file_size(log)
+            if size < offset:
+                break  # log was reset by someone else: reload below
+            if size > offset:
+                logged, _cached_offsets[log] = _read_log(log, offset)
+                s.setdefault(key_name, []).extend(logged)
+        else:
+            s["_history_count"] = len(s.get("history", ()))
+            return s
+
+    s = loads(SESSION_FILE.read_bytes())
+    refs = s.pop("file_refs", None)
+    if refs is not None:
+        s["files"] = AttachedFiles(refs)
+    offsets = {}
+    for key_name, log in _SESSION_LOGS:
+        logged, offsets[log] = _read_log(log)
+        if logged:
+            s.setdefault(key_name, []).extend(logged)
+    s["_history_count"] = len(s.get("history", ()))
+    _cached_session, _cached_key, _cached_offsets = s, key, offsets
+    return s
+
+
+def session_counts(session: dict):
+    """Return (history, files) counts, falling back to len() for old sessions"""
+    sg = session.get
+    hc = sg("_history_count")
+    if hc is None:
+        hc = len(sg("history", ()))
+    # Derived on every call: len() of the files mapping is cheap (it doesn't
+    # read any bodies) and can't go stale like a stored count
+    return hc, len(sg("files", ()))
 
 
 def save_session(session: dict):
-    SESSION_FILE.write_text(json.dumps(session, indent=2))
+    global _cached_session, _cached_key, _cached_offsets
+    # Written aside and renamed over the old file, so an interrupted save
+    # (double Ctrl+C) never leaves a truncated session behind
+    snapshot = session
+    files = session.get("files")
+    if files is not None:
+        snapshot = dict(session)
+        del snapshot["files"]
+        snapshot["file_refs"] = _file_refs(files)
+    tmp_file = SESSION_FILE.with_name(SESSION_FILE.name + ".tmp")
+    tmp_file.write_bytes(dumps(snapshot))
+    os.replace(tmp_file, SESSION_FILE)
+    _clear_logs()  # the snapshot now holds every logged entry
+    st = SESSION_FILE.stat()
+    _cached_session, _cached_key, _cached_offsets = session, (SESSION_FILE, st.st_mtime_ns, st.st_size), {}
 
 
 def start_session(write=False):
@@ -34,7 +206,8 @@ def start_session(write=False):
         "files": {},
         "changes": [],
         "pending_actions": [],
-        "active_provider_id": registry.default_provider_id
+        "active_provider_id": registry.default_provider_id,
+        "_history_count": 0,
     }
 
     save_session(session)
@@ -42,16 +215,20 @@ def start_session(write=False):
 
 
 def end_session():
-    if SESSION_FILE.exists():
+    global _cached_session
+    _cached_session = None
+    try:
         SESSION_FILE.unlink()
+    except FileNotFoundError:
+        pass
+    _clear_logs()
+    shutil.rmtree(FILES_DIR, ignore_errors=True)
 
 
 def add_history(entry: str):
-    s = load_session()
-    if not s:
+    if not SESSION_FILE.exists():
         return
-    s["history"].append(entry)
-    save_session(s)
+    _append_log(HISTORY_FILE, entry)
 
 
 def attach_file(path: str):
@@ -60,13 +237,21 @@ def attach_file(path: str):
         raise RuntimeError("Keine aktive Session")
 
     p = Path(path).expanduser().resolve()
-    if not p.exists() or not p.is_file():
+    if not p.is_file():  # also False when it doesn't exist
         raise FileNotFoundError(path)
 
     s["files"][str(p)] = p.read_text()
     save_session(s)
 
 
+def get_attached_file(path: str):
+    """Contents of an attached file, or None if it isn't attached"""
+    s = load_session()
+    if not s:
+        return None
+    return s.get("files", {}).get(str(Path(path).expanduser().resolve()))
+
+
 def set_active_provider(provider_id: str):
     """Set active AI provider for session"""
     s = load_session()
@@ -91,9 +276,7 @@ def get_active_provider() -> str:
 
 
 def record_change(entry: str):
-    s = load_session()
-    if not s:
+    if not SESSION_FILE.exists():
         return
-    s["changes"].append(entry)
-    save_session(s)
+    _append_log(CHANGES_FILE, entry)
 
@@ -3,13 +3,17 @@
 Simple Copilot-style session shell
 Fixed layout with prompt at bottom
 """
+import bisect
 import os
 import sys
 import shutil
 import signal
+import subprocess
+import threading
 import time
-import re
+from functools import lru_cache
 from pathlib import Path
+from typing import NamedTuple
 
 try:
     from prompt_toolkit import PromptSession
@@ -22,6 +26,13 @@ except ImportError:
     import readline
     import atexit
 
+# libgit2 bindings for in-process git queries; the git CLI is used without them
+try:
+    import pygit2
+    PYGIT2_AVAILABLE = True
+except ImportError:
+    PYGIT2_AVAILABLE = False
+
 BASE_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(BASE_DIR))
 
@@ -43,9 +54,60 @@ _last_sigint_time = 0
 _sigint_count = 0
 
 
+# Home, clear screen, clear scrollback: what `clear` itself sends
+CLEAR_SEQUENCE = "\x1b[H\x1b[2J\x1b[3J"
+
+
+def _enable_vt_mode() -> bool:
+    """Make sure the terminal understands ANSI escapes (Windows consoles need opting in)"""
+    if os.name != 'nt':
+        return True
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except Exception:
+        return False
+
+
+_VT_MODE = _enable_vt_mode()
+
+
 def clear_screen():
     """Clear terminal screen"""
-    os.system('clear' if os.name != 'nt' else 'cls')
+    if _VT_MODE:
+        # Written directly instead of spawning a shell running `clear`
+        sys.stdout.write(CLEAR_SEQUENCE)
+        sys.stdout.flush()
+    else:
+        os.system('cls')
+
+
+def write_frame(frame: str):
+    """Write a whole frame to the terminal in as few syscalls as possible
+
+    Goes straight to the file descriptor with os.write, skipping the
+    TextIOWrapper layer. Anything still buffered in sys.stdout is flushed
+    first so output stays in order; a stdout without a real descriptor
+    (e.g. captured in tests) gets a plain write().
+    """
+    stdout = sys.stdout
+    try:
+        fd = stdout.fileno()
+    except (AttributeError, OSError, ValueError):  # io.UnsupportedOperation is an OSError
+        stdout.write(frame)
+        stdout.flush()
+        return
+    stdout.flush()
+    data = frame.encode(stdout.encoding or "utf-8", "replace")
+    while data:
+        written = os.write(fd, data)
+        data = data[written:]
 
 
 def get_terminal_size():
@@ -53,96 +115,231 @@ def get_terminal_size():
     return shutil.get_terminal_size(fallback=(120, 40))
 
 
-ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+class Span(NamedTuple):
+    """Text with its colored rendering; the width comes from plain, no ANSI stripping"""
+    plain: str
+    colored: str
 
+    def pad(self, width: int) -> str:
+        return f"{self.colored}{' ' * max(width - len(self.plain), 0)}"
 
-def strip_ansi(text: str) -> str:
-    return ANSI_RE.sub("", text)
 
+def dim(text: str) -> Span:
+    return Span(text, f"{Colors.DIM}{text}{Colors.RESET}")
 
-def visible_len(text: str) -> int:
-    return len(strip_ansi(text))
 
+def white(text: str) -> Span:
+    return Span(text, f"{Colors.BRIGHT_WHITE}{text}{Colors.RESET}")
 
-def pad_to(text: str, width: int) -> str:
-    padding = max(width - visible_len(text), 0)
-    return f"{text}{' ' * padding}"
 
+_EMPTY_SPAN = Span("", "")
 
-def get_git_branch():
-    """Get current git branch with dirty indicator"""
+
+HOME = os.path.expanduser("~")
+
+
+@lru_cache(maxsize=None)
+def get_short_cwd() -> str:
+    """Working directory with HOME shortened to ~ (computed once; the shell never chdirs)"""
+    cwd = os.getcwd()
+    return "~" + cwd[len(HOME):] if cwd.startswith(HOME) else cwd
+
+
+# Rules and borders only change with the terminal width, so they are built
+# once per width rather than on every frame
+@lru_cache(maxsize=8)
+def _hline(width: int) -> str:
+    return "─" * width
+
+
+@lru_cache(maxsize=8)
+def _dim_hline(width: int) -> str:
+    return f"{Colors.DIM}{_hline(width)}{Colors.RESET}"
+
+
+@lru_cache(maxsize=8)
+def _panel_borders(inner_width: int):
+    """(top, bottom) border lines of the session panel"""
+    rule = _hline(inner_width)
+    return (
+        f"{Colors.ACCENT}╭{rule}╮{Colors.RESET}",
+        f"{Colors.ACCENT}╰{rule}╯{Colors.RESET}",
+    )
+
+
+GIT_BRANCH_TTL = 2.0  # seconds; the branch rarely changes between prompts
+_GIT_BRANCH_CACHE = (0.0, None)  # (monotonic timestamp, branch)
+_GIT_REPO = None  # pygit2.Repository, False once opening it failed
+# Held while the branch is being read; serializes the pygit2 handle between
+# the render path and the background refresh
+_GIT_BRANCH_LOCK = threading.Lock()
+
+
+def _git_branch_pygit2():
+    """Branch with dirty indicator read in-process (None without pygit2 or on error)"""
+    global _GIT_REPO
+    if not PYGIT2_AVAILABLE or _GIT_REPO is False:
+        return None
     try:
-        import subprocess
+        if _GIT_REPO is None:
+            _GIT_REPO = pygit2.Repository(str(BASE_DIR))
+        repo = _GIT_REPO
+        if repo.head_is_unborn:
+            return ""
+        branch = "HEAD" if repo.head_is_detached else repo.head.shorthand
+        is_dirty = any(
+            flags != pygit2.GIT_STATUS_CURRENT and not flags & pygit2.GIT_STATUS_IGNORED
+            for flags in repo.status().values()
+        )
+    except (pygit2.GitError, KeyError):
+        if _GIT_REPO is None:
+            _GIT_REPO = False  # not a repository: don't retry every frame
+        return None
+    return f"{branch}*" if is_dirty else branch
+
+
+def _git_branch_subprocess():
+    """Branch with dirty indicator from a single git status call"""
+    try:
+        # --no-optional-locks: a status poll shouldn't refresh (lock) the index
         result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+            ["git", "--no-optional-locks", "status", "--branch", "--porcelain=v2", "-z"],
             capture_output=True,
-            text=True,
             cwd=BASE_DIR
         )
+        branch = ""
+        is_dirty = False
         if result.returncode == 0:
-            branch = result.stdout.strip()
-            status = subprocess.run(
-                ["git", "status", "--porcelain"],
-                capture_output=True,
-                text=True,
-                cwd=BASE_DIR
-            )
-            is_dirty = bool(status.stdout.strip())
-            return f"{branch}*" if is_dirty else branch
-        return ""
+            for record in result.stdout.decode("utf-8", "replace").split("\0"):
+                if record.startswith("# branch.head "):
+                    branch = record[len("# branch.head "):]
+                    if branch == "(detached)":
+                        branch = "HEAD"
+                elif record and not record.startswith("#"):
+                    is_dirty = True
+        if branch and is_dirty:
+            branch = f"{branch}*"
     except:
-        return ""
+        branch = ""
+    return branch
 
 
-def build_claude_panel_lines(session, term_width):
-    """Build Claude-style panel header lines."""
-    from tools.ai.providers import get_provider_registry
-    from tools.config import get_config
+def _read_git_branch():
+    """Read the branch and store it in the cache (caller holds _GIT_BRANCH_LOCK)"""
+    global _GIT_BRANCH_CACHE
+    branch = _git_branch_pygit2()
+    if branch is None:
+        branch = _git_branch_subprocess()
+    _GIT_BRANCH_CACHE = (time.monotonic(), branch)
+    return branch
+
+
+def get_git_branch():
+    """Get current git branch with dirty indicator (pygit2 or one git call, cached for GIT_BRANCH_TTL)"""
+    ts, branch = _GIT_BRANCH_CACHE
+    if branch is not None and time.monotonic() - ts < GIT_BRANCH_TTL:
+        return branch
+
+    if not _GIT_BRANCH_LOCK.acquire(blocking=False):
+        # A background refresh is running: draw with the previous branch
+        # instead of waiting for it, the next frame picks up the new one
+        if branch is not None:
+            return branch
+        _GIT_BRANCH_LOCK.acquire()
+    try:
+        ts, branch = _GIT_BRANCH_CACHE
+        if branch is not None and time.monotonic() - ts < GIT_BRANCH_TTL:
+            return branch
+        return _read_git_branch()
+    finally:
+        _GIT_BRANCH_LOCK.release()
+
+
+def prefetch_git_branch():
+    """Refresh a stale branch cache in a background thread.
+
+    Called right after a command was read, so the git query overlaps with
+    handling the command instead of delaying the next frame. Does nothing
+    while a refresh is already running.
+    """
+    ts, branch = _GIT_BRANCH_CACHE
+    if branch is not None and time.monotonic() - ts < GIT_BRANCH_TTL:
+        return
+    if not _GIT_BRANCH_LOCK.acquire(blocking=False):
+        return
+
+    def refresh():
+        try:
+            _read_git_branch()
+        finally:
+            _GIT_BRANCH_LOCK.release()
+
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+_LAST_PANEL = (None, ())  # (key, lines) of the last built panel
+
+
+def build_claude_panel_lines(session, term_width, registry=None):
+    """Build Claude-style panel header lines.
+
+    simple_shell passes its registry so the per-frame path skips the
+    import statements and the registry lookup.
+    """
+    if registry is None:
+        from tools.ai.providers import get_provider_registry
+        registry = get_provider_registry()
 
     if "active_provider_id" not in session or not session.get("active_provider_id"):
-        config = get_config()
-        session["active_provider_id"] = config.default_provider
+        from tools.config import get_config
+        session["active_provider_id"] = get_config().default_provider
 
-    registry = get_provider_registry()
     provider = registry.get_provider(session.get("active_provider_id"))
 
-    cwd = os.getcwd()
-    home = os.path.expanduser("~")
-    short_cwd = "~" + cwd[len(home):] if cwd.startswith(home) else cwd
-
+    short_cwd = get_short_cwd()
     git_branch = get_git_branch()
     branch_label = f"{short_cwd}{f' [{git_branch}]' if git_branch else ''}"
 
+    # Everything the panel shows; an unchanged key reuses the last panel
+    key = (
+        term_width, provider.id, branch_label, session.get('id', 'unknown'),
+        bool(session.get('write')), len(session.get('history', [])),
+    )
+    global _LAST_PANEL
+    if _LAST_PANEL[0] == key:
+        return list(_LAST_PANEL[1])
+
     model_short = provider.id.replace("openai-", "").replace("anthropic-", "")
-    model_label = f"{Colors.DIM}{model_short} (1x){Colors.RESET}"
+    model_label = dim(f"{model_short} (1x)")
 
     inner_width = max(term_width - 2, 60)
     content_width = inner_width - 2
-    lines = []
-    lines.append(f"{Colors.ACCENT}╭{'─' * inner_width}╮{Colors.RESET}")
+    top_border, bottom_border = _panel_borders(inner_width)
+    lines = [top_border]
 
-    title_left = f"{Colors.BRIGHT_WHITE}LinkoWiki Code{Colors.RESET} {Colors.DIM}Session{Colors.RESET}"
-    title_spacing = content_width - visible_len(title_left) - visible_len(model_label)
+    title_left = white("LinkoWiki Code")
+    title_right = dim("Session")
+    title_spacing = content_width - len(title_left.plain) - 1 - len(title_right.plain) - len(model_label.plain)
     if title_spacing < 1:
         title_spacing = 1
     lines.append(
         f"{Colors.ACCENT}│{Colors.RESET} "
-        f"{title_left}{' ' * title_spacing}{model_label}"
+        f"{title_left.colored} {title_right.colored}{' ' * title_spacing}{model_label.colored}"
         f" {Colors.ACCENT}│{Colors.RESET}"
     )
 
     left_lines = [
-        f"{Colors.BRIGHT_WHITE}Welcome back!{Colors.RESET}",
-        f"{Colors.DIM}Session ID: {session.get('id', 'unknown')}{Colors.RESET}",
-        f"{Colors.DIM}Mode: {'Write' if session.get('write') else 'Read-only'}{Colors.RESET}",
-        f"{Colors.DIM}Path: {branch_label}{Colors.RESET}",
+        white("Welcome back!"),
+        dim(f"Session ID: {session.get('id', 'unknown')}"),
+        dim(f"Mode: {'Write' if session.get('write') else 'Read-only'}"),
+        dim(f"Path: {branch_label}"),
     ]
     right_lines = [
-        f"{Colors.BRIGHT_WHITE}Tips for getting started{Colors.RESET}",
-        f"{Colors.DIM}Use /help to see commands{Colors.RESET}",
-        f"{Colors.DIM}Use /attach <file> to add context{Colors.RESET}",
-        f"{Colors.BRIGHT_WHITE}Recent activity{Colors.RESET}",
-        f"{Colors.DIM}{len(session.get('history', []))} messages so far{Colors.RESET}",
+        white("Tips for getting started"),
+        dim("Use /help to see commands"),
+        dim("Use /attach <file> to add context"),
+        white("Recent activity"),
+        dim(f"{len(session.get('history', []))} messages so far"),
     ]
 
     left_width = (content_width - 1) // 2
@@ -150,47 +347,48 @@ def build_claude_panel_lines(session, term_width):
     max_lines = max(len(left_lines), len(right_lines))
 
     for idx in range(max_lines):
-        left_text = left_lines[idx] if idx < len(left_lines) else ""
-        right_text = right_lines[idx] if idx < len(right_lines) else ""
-        left_padded = pad_to(left_text, left_width)
-        right_padded = pad_to(right_text, right_width)
+        left = left_lines[idx] if idx < len(left_lines) else _EMPTY_SPAN
+        right = right_lines[idx] if idx < len(right_lines) else _EMPTY_SPAN
+        left_padded = left.pad(left_width)
+        right_padded = right.pad(right_width)
         lines.append(
             f"{Colors.ACCENT}│{Colors.RESET} "
             f"{left_padded}{Colors.ACCENT}│{Colors.RESET} "
             f"{right_padded} {Colors.ACCENT}│{Colors.RESET}"
         )
 
-    lines.append(f"{Colors.ACCENT}╰{'─' * inner_width}╯{Colors.RESET}")
+    lines.append(bottom_border)
+    _LAST_PANEL = (key, tuple(lines))
     return lines
 
 
-def render_copilot_screen(session, content_lines=None):
+def render_copilot_screen(session, content_lines=None, registry=None):
     """Render complete Claude-style screen"""
     term_width, _ = get_terminal_size()
 
+    # The frame is assembled first and written with a single write()
     # Don't clear screen - preserve terminal history
-    print()
-    for line in build_claude_panel_lines(session, term_width):
-        print(line)
-    print()
+    buf = [""]
+    buf.extend(build_claude_panel_lines(session, term_width, registry))
+    buf.append("")
 
     # Content area (if any)
     if content_lines:
-        print()
-        for line in content_lines:
-            print(line)
-        print()
+        buf.append("")
+        buf.extend(content_lines)
+        buf.append("")
 
     hints = [
         f"{Colors.DIM}Try \"/help\" for commands{Colors.RESET}",
         f"{Colors.DIM}? for shortcuts{Colors.RESET}",
     ]
     for line in hints:
-        print(f"  {line}")
-    print()
+        buf.append(f"  {line}")
+    buf.append("")
 
-    print(f"{Colors.DIM}{'─' * term_width}{Colors.RESET}")
-    print(f"> ", end="", flush=True)
+    buf.append(_dim_hline(term_width))
+    buf.append("> ")
+    write_frame("\n".join(buf))
 
 
 def sigint_handler(signum, frame):
@@ -238,6 +436,24 @@ COMMAND_DESCRIPTIONS = {
     "help": "Show help",
 }
 
+# Sorted, so the commands sharing a prefix are one contiguous bisect range
+_COMMANDS_SORTED = sorted(COMMANDS)
+
+
+def _with_prefix(options, prefix):
+    """Entries of the sorted list options starting with prefix, in order"""
+    i = bisect.bisect_left(options, prefix)
+    matches = []
+    while i < len(options) and options[i].startswith(prefix):
+        matches.append(options[i])
+        i += 1
+    return matches
+
+
+def _commands_with_prefix(prefix):
+    """Commands starting with prefix, in sorted order"""
+    return _with_prefix(_COMMANDS_SORTED, prefix)
+
 
 if PROMPT_TOOLKIT_AVAILABLE:
     class PromptToolkitCompleter(Completer):
@@ -248,15 +464,13 @@ if PROMPT_TOOLKIT_AVAILABLE:
             text = document.text_before_cursor
 
             # Show all commands if we're at the beginning or after typing /
-            for cmd in COMMANDS:
-                if cmd.startswith(text):
-                    description = COMMAND_DESCRIPTIONS.get(cmd, "")
-                    yield Completion(
-                        cmd,
-                        start_position=-len(text),
-                        display=cmd,
-                        display_meta=description
-                    )
+            for cmd in _commands_with_prefix(text):
+                yield Completion(
+                    cmd,
+                    start_position=-len(text),
+                    display=cmd,
+                    display_meta=COMMAND_DESCRIPTIONS.get(cmd, "")
+                )
 
 
 class ReadlineCompleter:
@@ -270,7 +484,7 @@ class ReadlineCompleter:
         if state == 0:
             # First call: generate matches
             if text:
-                self.matches = [cmd for cmd in self.options if cmd.startswith(text)]
+                self.matches = _with_prefix(self.options, text)
             else:
                 self.matches = self.options[:]
 
@@ -322,6 +536,10 @@ def simple_shell():
         print(f"{Colors.DIM}run 'linkowiki-admin session start' first{Colors.RESET}\n")
         return
 
+    # Looked up once; every frame and /model command reuses it
+    from tools.ai.providers import get_provider_registry
+    registry = get_provider_registry()
+
     # Setup input method
     if PROMPT_TOOLKIT_AVAILABLE:
         history_file = BASE_DIR / ".copilot_history"
@@ -337,7 +555,7 @@ def simple_shell():
 
     content = []
     while True:
-        render_copilot_screen(s, content)
+        render_copilot_screen(s, content, registry)
 
         try:
             # Get input
@@ -346,10 +564,11 @@ def simple_shell():
             else:  # readline fallback
                 cmd = input().strip()
 
+            prefetch_git_branch()
+
             # Print double separator AFTER input for visual separation
             term_width, _ = get_terminal_size()
-            print(f"{Colors.DIM}{'─' * term_width}{Colors.RESET}")
-            print()  # Empty line for spacing
+            sys.stdout.write(f"{_dim_hline(term_width)}\n\n")  # rule + empty line for spacing
 
             # Reset SIGINT counter on successful input
             global _sigint_count
@@ -360,8 +579,7 @@ def simple_shell():
         except KeyboardInterrupt:
             # Print separator after Ctrl+C
             term_width, _ = get_terminal_size()
-            print(f"\n{Colors.DIM}{'─' * term_width}{Colors.RESET}")
-            print()  # Empty line for spacing
+            sys.stdout.write(f"\n{_dim_hline(term_width)}\n\n")  # rule + empty line for spacing
             content = [f"  {Colors.YELLOW}Press Ctrl+C again to exit{Colors.RESET}"]
             continue
         
@@ -387,13 +605,11 @@ def simple_shell():
             continue
         
         if cmd == "/model":
-            from tools.ai.providers import get_provider_registry
-            registry = get_provider_registry()
             provider = registry.get_provider(s.get("active_provider_id"))
             
             content = [
                 f"  {Colors.BRIGHT_WHITE}Active Model{Colors.RESET}",
-                f"  {Colors.DIM}{'─' * 60}{Colors.RESET}",
+                f"  {_dim_hline(60)}",
                 f"  ID: {provider.id}",
                 f"  Provider: {provider.provider}",
                 f"  Type: {'Reasoning' if provider.reasoning else 'Text'}",
@@ -403,8 +619,6 @@ def simple_shell():
             continue
         
         if cmd == "/model list":
-            from tools.ai.providers import get_provider_registry
-            registry = get_provider_registry()
             providers = registry.list_providers()
             
             content = [f"  {Colors.BRIGHT_WHITE}Available Models{Colors.RESET}", ""]
@@ -2,6 +2,7 @@
 """Validate providers.json against schema - CI/CD integration"""
 import json
 import sys
+from collections import Counter
 from pathlib import Path
 
 try:
@@ -11,6 +12,54 @@ except ImportError:
     print("Run: pip install jsonschema")
     sys.exit(1)
 
+# Optional: fastjsonschema compiles the schema to plain Python, which
+# validates much faster than jsonschema re-walking it
+try:
+    import fastjsonschema
+    FASTJSONSCHEMA_AVAILABLE = True
+except ImportError:
+    FASTJSONSCHEMA_AVAILABLE = False
+
+# Optional: orjson parses several times faster than the json module (its
+# JSONDecodeError subclasses json's, so the handler below catches both)
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+def _validate_with_fastjsonschema(config, schema) -> bool:
+    """Schema check through a fastjsonschema-compiled validator"""
+    try:
+        fastjsonschema.compile(schema)(config)
+        print("✓ providers.json is valid")
+    except fastjsonschema.JsonSchemaValueException as e:
+        print(f"ERROR: Schema validation failed:")
+        print(f"  Path: {' -> '.join(str(p) for p in e.path[1:])}")  # drop the leading "data"
+        print(f"  Message: {e.message}")
+        return False
+    except fastjsonschema.JsonSchemaDefinitionException as e:
+        print(f"ERROR: Invalid schema: {e}")
+        return False
+    return True
+
+
+def _validate_with_jsonschema(config, schema) -> bool:
+    """Schema check through jsonschema (used when fastjsonschema is missing)"""
+    try:
+        jsonschema.validate(instance=config, schema=schema)
+        print("✓ providers.json is valid")
+    except jsonschema.ValidationError as e:
+        print(f"ERROR: Schema validation failed:")
+        print(f"  Path: {' -> '.join(str(p) for p in e.path)}")
+        print(f"  Message: {e.message}")
+        return False
+    except jsonschema.SchemaError as e:
+        print(f"ERROR: Invalid schema: {e}")
+        return False
+    return True
+
 
 def validate_providers_config():
     """Validate providers.json against schema"""
@@ -29,26 +78,18 @@ def validate_providers_config():
     
     # Load files
     try:
-        with open(config_path) as f:
-            config = json.load(f)
+        with open(config_path, "rb") as f:
+            config = _loads(f.read())
         
-        with open(schema_path) as f:
-            schema = json.load(f)
+        with open(schema_path, "rb") as f:
+            schema = _loads(f.read())
     except json.JSONDecodeError as e:
         print(f"ERROR: Invalid JSON: {e}")
         return False
     
     # Validate against schema
-    try:
-        jsonschema.validate(instance=config, schema=schema)
-        print("✓ providers.json is valid")
-    except jsonschema.ValidationError as e:
-        print(f"ERROR: Schema validation failed:")
-        print(f"  Path: {' -> '.join(str(p) for p in e.path)}")
-        print(f"  Message: {e.message}")
-        return False
-    except jsonschema.SchemaError as e:
-        print(f"ERROR: Invalid schema: {e}")
+    schema_check = _validate_with_fastjsonschema if FASTJSONSCHEMA_AVAILABLE else _validate_with_jsonschema
+    if not schema_check(config, schema):
         return False
     
     # Additional semantic validation
@@ -58,17 +99,17 @@ def validate_providers_config():
     if not providers:
         errors.append("No providers defined")
     
+    # One pass over the IDs serves both the default lookup and the duplicate check
+    id_counts = Counter(p["id"] for p in providers)
+
     default_provider = config.get("default_provider")
     if not default_provider:
         errors.append("No default_provider specified")
-    else:
-        provider_ids = [p["id"] for p in providers]
-        if default_provider not in provider_ids:
-            errors.append(f"default_provider '{default_provider}' not found in providers")
+    elif default_provider not in id_counts:
+        errors.append(f"default_provider '{default_provider}' not found in providers")
     
     # Check for duplicate IDs
-    provider_ids = [p["id"] for p in providers]
-    duplicates = [pid for pid in provider_ids if provider_ids.count(pid) > 1]
+    duplicates = [pid for pid, count in id_counts.items() if count > 1]
     if duplicates:
         errors.append(f"Duplicate provider IDs: {set(duplicates)}")
     
@@ -1,83 +1,262 @@
 # tools/wiki_search.py
 """Search and browse wiki content"""
+import heapq
+import itertools
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
 
-def search_wiki(query: str, wiki_dir: Path) -> List[Tuple[Path, List[str]]]:
-    """Search wiki files for query string"""
+# Results of the category helpers, keyed by (function, root, root mtime/size,
+# category dir mtimes, generation). The dir mtimes catch files added or
+# removed in a category, also by external edits; the generation is bumped by
+# invalidate_cache() after writes the directory mtimes would not reflect
+# (content edits, deeper subdirectories).
+_CACHE = {}
+_GENERATION = 0
+
+
+def invalidate_cache():
+    """Drop cached category results (call after modifying wiki files)"""
+    global _GENERATION
+    _GENERATION += 1
+    _CACHE.clear()
+
+
+def _cache_key(name: str, wiki_dir: Path):
+    st = os.stat(wiki_dir)
+    dir_mtimes = []
+    with os.scandir(wiki_dir) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                dir_mtimes.append((entry.name, entry.stat(follow_symlinks=False).st_mtime_ns))
+    dir_mtimes.sort()
+    return (name, os.fspath(wiki_dir), st.st_mtime_ns, st.st_size,
+            tuple(dir_mtimes), _GENERATION)
+
+
+def _iter_wiki_entries(root: Path) -> Iterator[os.DirEntry]:
+    """Yield DirEntry objects for all non-hidden files below root.
+
+    Uses os.scandir so is_file()/stat() reuse the data already returned by
+    the directory listing instead of issuing extra stat() calls per file.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif not entry.name.startswith('.') and entry.is_file():
+                        yield entry
+        except (PermissionError, FileNotFoundError, NotADirectoryError):
+            continue
+
+
+def _iter_mtime(root: Path) -> Iterator[Tuple[str, float]]:
+    """Yield (path, mtime) for all non-hidden files below root"""
+    for entry in _iter_wiki_entries(root):
+        yield entry.path, entry.stat().st_mtime
+
+
+def _search_file_bytes(path: str, needle: bytes) -> List[str]:
+    """Find a lowercased ASCII needle in one file, one hit per line"""
+    matches = []
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data:
+        return matches
+    # bytes.lower() folds exactly the ASCII letters re.IGNORECASE folds for
+    # bytes, and find() on the lowered copy is a plain C substring search;
+    # an IGNORECASE regex has to test every position case-insensitively
+    haystack = data.lower()
+    line_no = 1
+    counted_to = 0
+    pos = haystack.find(needle)
+    while pos != -1:
+        line_no += haystack.count(b'\n', counted_to, pos)
+        counted_to = pos
+        line_start = haystack.rfind(b'\n', 0, pos) + 1
+        line_end = haystack.find(b'\n', pos)
+        if line_end == -1:
+            line_end = len(haystack)
+        line = data[line_start:line_end].decode('utf-8', 'replace')
+        matches.append(f"Line {line_no}: {line.strip()}")
+        pos = haystack.find(needle, line_end + 1)  # next line onwards
+    return matches
+
+
+def _search_file_text(path: str, pattern: "re.Pattern[str]") -> List[str]:
+    """Scan one file line by line with a str regex"""
+    content = Path(path).read_text()
+    # One scan over the whole text first: most files don't match at all,
+    # and those never get split into a list of lines
+    if pattern.search(content) is None:
+        return []
+    return [
+        f"Line {i}: {line.strip()}"
+        for i, line in enumerate(content.split('\n'), 1)
+        if pattern.search(line)
+    ]
+
+
+# Below this many files search_wiki scans in the calling thread
+SEARCH_PARALLEL_MIN_FILES = 64
+
+
+def search_wiki(query: str, wiki_dir: Path) -> List[Tuple[str, List[str]]]:
+    """Search wiki files for query string (paths are returned as str)"""
     results = []
     
     if not wiki_dir.exists():
         return results
     
-    pattern = re.compile(re.escape(query), re.IGNORECASE)
+    # ASCII queries are matched as bytes (C-level substring search, no
+    # decode of non-matching text). Only ASCII letters are case-folded that
+    # way, so queries with umlauts etc. use the str regex path instead.
+    if query.isascii():
+        needle = query.encode('ascii').lower()
+        search_file = _search_file_bytes
+    else:
+        needle = re.compile(re.escape(query), re.IGNORECASE)
+        search_file = _search_file_text
+    
+    def search_entry(entry):
+        try:
+            return search_file(entry.path, needle)
+        except Exception:
+            return None
     
-    for file_path in wiki_dir.rglob("*"):
-        if file_path.is_file() and not file_path.name.startswith('.'):
-            try:
-                content = file_path.read_text()
-                lines = content.split('\n')
-                matches = []
-                
-                for i, line in enumerate(lines, 1):
-                    if pattern.search(line):
-                        matches.append(f"Line {i}: {line.strip()}")
-                
-                if matches:
-                    results.append((file_path, matches))
-            except Exception:
-                continue
+    entries = list(_iter_wiki_entries(wiki_dir))
+    # Files are independent: overlap their reads (cold caches, network
+    # filesystems) on larger trees; small ones aren't worth the pool
+    workers = min(8, os.cpu_count() or 1)
+    if workers > 1 and len(entries) >= SEARCH_PARALLEL_MIN_FILES:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            found = pool.map(search_entry, entries)
+            results = [(e.path, m) for e, m in zip(entries, found) if m]
+    else:
+        for entry in entries:
+            matches = search_entry(entry)
+            if matches:
+                results.append((entry.path, matches))
     
     return results
 
 
-def list_recent_files(wiki_dir: Path, limit: int = 10) -> List[Tuple[Path, float]]:
-    """List recently modified wiki files"""
+def list_recent_files(wiki_dir: Path, limit: int = 10) -> List[Tuple[str, float]]:
+    """List recently modified wiki files (paths are returned as str)"""
     if not wiki_dir.exists():
         return []
     
-    files = []
-    for file_path in wiki_dir.rglob("*"):
-        if file_path.is_file() and not file_path.name.startswith('.'):
-            mtime = file_path.stat().st_mtime
-            files.append((file_path, mtime))
-    
-    files.sort(key=lambda x: x[1], reverse=True)
-    return files[:limit]
+    return heapq.nlargest(limit, _iter_mtime(wiki_dir), key=itemgetter(1))
 
 
-def get_wiki_categories(wiki_dir: Path) -> List[str]:
-    """Get list of wiki categories (directories)"""
+def _scan_entries(entries, recent_limit: int):
+    """Count files and bytes of an entry stream, keeping the newest files.
+
+    Returns (files, total_size, recent) where recent holds up to
+    recent_limit (mtime, path) pairs sorted newest first.
+    """
+    files = 0
+    total_size = 0
+    recent = []
+    for entry in entries:
+        st = entry.stat()
+        files += 1
+        total_size += st.st_size
+        if len(recent) < recent_limit:
+            heapq.heappush(recent, (st.st_mtime, entry.path))
+        elif recent_limit:
+            heapq.heappushpop(recent, (st.st_mtime, entry.path))
+    recent.sort(reverse=True)
+    return files, total_size, recent
+
+
+def scan_wiki(wiki_dir: Path, recent_limit: int = 15, use_cache: bool = True):
+    """Collect categories, per-category stats and recent files in one walk.
+
+    Returns (categories, stats, recent) with the same shapes as
+    get_wiki_categories(), get_category_stats() and list_recent_files().
+    With use_cache=False the tree is always re-scanned (the fresh result
+    still replaces the cached one). Callers get copies, so mutating the
+    result never touches the cache.
+    """
     if not wiki_dir.exists():
-        return []
+        return [], {}, []
+    
+    try:
+        key = _cache_key(("scan", recent_limit), wiki_dir)
+    except OSError:
+        return [], {}, []
+    if use_cache and key in _CACHE:
+        return _copy_scan(_CACHE[key])
+    
+    # Split at the top level: files directly in the root form the "root"
+    # category, every top-level directory is scanned as its own subtree.
+    root_files = []
+    top_dirs = []
+    try:
+        with os.scandir(wiki_dir) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    top_dirs.append(entry)
+                elif not entry.name.startswith('.') and entry.is_file():
+                    root_files.append(entry)
+    except OSError:
+        return [], {}, []
+    
+    def scan_dir(entry):
+        return _scan_entries(_iter_wiki_entries(entry.path), recent_limit)
+    
+    parts = [("root", _scan_entries(root_files, recent_limit))]
+    # Cold caches / network filesystems: overlap the blocking stat() calls
+    # of independent subtrees. A single subtree gains nothing from threads.
+    workers = min(8, len(top_dirs), os.cpu_count() or 1)
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts.extend(zip((d.name for d in top_dirs), pool.map(scan_dir, top_dirs)))
+    else:
+        parts.extend((d.name, scan_dir(d)) for d in top_dirs)
     
     categories = set()
-    for item in wiki_dir.rglob("*"):
-        if item.is_file() and not item.name.startswith('.'):
-            relative = item.relative_to(wiki_dir)
-            if len(relative.parts) > 1:
-                categories.add(relative.parts[0])
+    stats = {}
+    recents = []
+    for idx, (category, (files, total_size, recent)) in enumerate(parts):
+        if not files:
+            continue
+        if idx:  # parts[0] are the files directly in the root
+            categories.add(category)
+        if category not in stats:
+            stats[category] = {"files": 0, "total_size": 0}
+        stats[category]["files"] += files
+        stats[category]["total_size"] += total_size
+        recents.append(recent)
     
-    return sorted(categories)
+    newest = itertools.islice(heapq.merge(*recents, reverse=True), recent_limit)
+    result = _CACHE[key] = (
+        sorted(categories),
+        stats,
+        [(path, mtime) for mtime, path in newest],
+    )
+    return _copy_scan(result)
+
+
+def _copy_scan(result):
+    """Copy of a cached scan_wiki result that callers may mutate freely"""
+    categories, stats, recent = result
+    return list(categories), {cat: dict(s) for cat, s in stats.items()}, list(recent)
+
+
+def get_wiki_categories(wiki_dir: Path) -> List[str]:
+    """Get list of wiki categories (directories)"""
+    return scan_wiki(wiki_dir)[0]
 
 
 def get_category_stats(wiki_dir: Path) -> dict:
     """Get statistics about wiki categories"""
-    if not wiki_dir.exists():
-        return {}
-    
-    stats = {}
-    for file_path in wiki_dir.rglob("*"):
-        if file_path.is_file() and not file_path.name.startswith('.'):
-            relative = file_path.relative_to(wiki_dir)
-            category = relative.parts[0] if len(relative.parts) > 1 else "root"
-            
-            if category not in stats:
-                stats[category] = {"files": 0, "total_size": 0}
-            
-            stats[category]["files"] += 1
-            stats[category]["total_size"] += file_path.stat().st_size
-    
-    return stats
+    return scan_wiki(wiki_dir)[1]